@@ -0,0 +1,67 @@
+import os
+import json
+import time
+import argparse
+import tempfile
+from benchmarks.synthetic import make_contest
+from yoink import codec
+from yoink.contest import Contest
+from yoink.submission import Submission
+
+
+def measure(fn, repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def legacy_load(path: str) -> Contest:
+    with open(path, 'r') as fp:
+        data = json.load(fp)
+    submissions = {}
+    for serialized_submission in data['Submissions'].values():
+        submission = Submission.deserialize(string=json.dumps(serialized_submission))
+        submissions[submission.id] = submission
+    data['Submissions'] = {}
+    contest = Contest.deserialize(data=data)
+    contest.submissions = submissions
+    return contest
+
+
+def run(size: int, repeat: int) -> None:
+    contest = make_contest(1000, size)
+    data = Contest.serialize(instance=contest)
+    rows = []
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'meta.legacy.json')
+
+        def legacy_dump():
+            with open(path, 'w+') as fp:
+                json.dump(data, fp, indent=4)
+
+        rows.append(('legacy json', measure(legacy_dump, repeat), measure(lambda: legacy_load(path), repeat),
+                     os.path.getsize(path)))
+
+        for instance in codec.get_codecs():
+            path = os.path.join(directory, f'meta.{instance.extension}')
+            rows.append((instance.name,
+                         measure(lambda: codec.dump(data, path, instance), repeat),
+                         measure(lambda: Contest.deserialize(data=codec.load(path, instance)), repeat),
+                         os.path.getsize(path)))
+
+    print(f'\n======== {size} submissions, best of {repeat} ========')
+    print(f'{"format":<14}{"dump, s":>10}{"load, s":>10}{"size, KiB":>12}')
+    for name, dump_time, load_time, file_size in rows:
+        print(f'{name:<14}{dump_time:>10.3f}{load_time:>10.3f}{file_size / 1024:>12.1f}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--size', type=int, nargs='+', default=[1000, 10000, 50000])
+    parser.add_argument('--repeat', type=int, default=3)
+    arguments = parser.parse_args()
+    for size in arguments.size:
+        run(size, arguments.repeat)
@@ -0,0 +1,158 @@
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import builtins
+import datetime
+import tempfile
+import tracemalloc
+import subprocess
+from collections import Counter
+from contextlib import contextmanager
+from typing import Optional
+from benchmarks.synthetic import make_contest, make_status, make_source
+from yoink.contest import Contest
+from yoink.utils import Config, merge_data_sources
+
+__results_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+__tracked = {
+    'open': (builtins, 'open'),
+    'exists': (os.path, 'exists'),
+    'mkdir': (os, 'mkdir'),
+    'makedirs': (os, 'makedirs'),
+    'remove': (os, 'remove'),
+    'rename': (os, 'rename'),
+    'replace': (os, 'replace'),
+    'listdir': (os, 'listdir'),
+    'scandir': (os, 'scandir'),
+    'copytree': (shutil, 'copytree'),
+}
+
+
+@contextmanager
+def count_fs_operations(counter: Counter):
+    originals = {name: getattr(owner, attribute) for name, (owner, attribute) in __tracked.items()}
+
+    def wrap(name, fn):
+        def wrapper(*args, **kwargs):
+            counter[name] += 1
+            return fn(*args, **kwargs)
+        return wrapper
+
+    wrappers = {name: wrap(name, fn) for name, fn in originals.items()}
+    # Modules keep their own aliases (OPE, OMD, ...), patch those as well.
+    patched = []
+    for module in [m for n, m in list(sys.modules.items()) if n.startswith('yoink') and m]:
+        for key, value in list(vars(module).items()):
+            for name, fn in originals.items():
+                if value is fn:
+                    patched.append((module, key, value))
+                    setattr(module, key, wrappers[name])
+    for name, (owner, attribute) in __tracked.items():
+        setattr(owner, attribute, wrappers[name])
+    try:
+        yield counter
+    finally:
+        for name, (owner, attribute) in __tracked.items():
+            setattr(owner, attribute, originals[name])
+        for module, key, value in patched:
+            setattr(module, key, value)
+
+
+def run_stage(name: str, size: int, fn) -> dict:
+    counter = Counter()
+    tracemalloc.start()
+    with count_fs_operations(counter):
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {'Stage': name, 'Size': size, 'Seconds': elapsed, 'Peak-Memory': peak, 'FS-Operations': dict(counter)}
+
+
+def benchmark(size: int, directory: str, max_files: int) -> list:
+    Config()['Path-Prefix'] = directory
+    Config()['Yoink-Path'] = 'data'
+    os.makedirs(Config().working_dir_path, exist_ok=True)
+
+    contest_id = 1000
+    status = make_status(contest_id, size)
+    contest = make_contest(contest_id, size, eligible_only=True)
+    submissions = list(contest.submissions.values())[:max_files if max_files >= 0 else None]
+    sources = {s.id: make_source(s.language, seed=s.id) for s in submissions}
+    results = []
+
+    results.append(run_stage('filter_raw_submissions', size,
+                             lambda: contest._Contest__filter_raw_submissions(status)))
+    results.append(run_stage('serialize', size,
+                             lambda: contest._Contest__dump()))
+    results.append(run_stage('deserialize', size,
+                             lambda: Contest.deserialize(path=Contest.get_path(contest_id, meta=True))))
+
+    def dump_code():
+        for submission in submissions:
+            submission._Submission__dump_code(sources[submission.id])
+
+    def validate_code():
+        for submission in submissions:
+            submission.validate_code(fixup=True)
+
+    results.append(run_stage('dump_code', len(submissions), dump_code))
+    results.append(run_stage('validate_code', len(submissions), validate_code))
+
+    source_path = Config().working_dir_path
+    target_path = os.path.join(directory, 'merged')
+    other = make_contest(contest_id + 1, size, seed=1, eligible_only=True)
+    other._Contest__dump()
+    shutil.copytree(Contest.get_path(contest_id), os.path.join(target_path, str(contest_id)))
+    results.append(run_stage('merge_data_sources', size,
+                             lambda: merge_data_sources(source_path, target_path)))
+    return results
+
+
+def get_version() -> str:
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'],
+                                       cwd=os.path.dirname(os.path.abspath(__file__)),
+                                       stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def print_results(results: list, baseline: Optional[list] = None) -> None:
+    baseline = {(r['Stage'], r['Size']): r for r in baseline or []}
+    print(f'\n{"stage":<24}{"size":>9}{"time, s":>10}{"peak, MiB":>11}{"fs ops":>9}{"vs base":>9}')
+    for result in results:
+        base = baseline.get((result['Stage'], result['Size']), None)
+        ratio = f'{result["Seconds"] / base["Seconds"]:>8.2f}x' if base and base['Seconds'] else f'{"-":>9}'
+        print(f'{result["Stage"]:<24}{result["Size"]:>9}{result["Seconds"]:>10.3f}'
+              f'{result["Peak-Memory"] / 1024 ** 2:>11.1f}{sum(result["FS-Operations"].values()):>9}{ratio}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--size', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--max-files', type=int, default=20000)
+    parser.add_argument('--compare', type=str, default=None)
+    arguments = parser.parse_args()
+
+    results = []
+    for size in arguments.size:
+        with tempfile.TemporaryDirectory() as directory:
+            results += benchmark(size, directory, arguments.max_files)
+
+    baseline = None
+    if arguments.compare:
+        with open(arguments.compare, 'r') as fp:
+            baseline = json.load(fp)['Results']
+    print_results(results, baseline)
+
+    os.makedirs(__results_path, exist_ok=True)
+    version = get_version()
+    path = os.path.join(__results_path, f'{datetime.datetime.now():%Y%m%d-%H%M%S}-{version}.json')
+    with open(path, 'w') as fp:
+        json.dump({'Version': version, 'Sizes': arguments.size, 'Results': results}, fp, indent=4)
+    print(f'\nResults saved to {path}')
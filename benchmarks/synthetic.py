@@ -0,0 +1,149 @@
+import random
+from typing import List
+from yoink import enums
+from yoink.contest import Contest
+from yoink.problem import Problem
+from yoink.submission import Submission
+from yoink.utils import Config
+
+__languages = [
+    (enums.Language.GPP17.value, 40),
+    (enums.Language.GPP17_64.value, 15),
+    (enums.Language.GPP14.value, 10),
+    (enums.Language.GPP11.value, 5),
+    (enums.Language.CLANG17_D.value, 2),
+    (enums.Language.MSCL17.value, 3),
+    (enums.Language.Java8.value, 8),
+    (enums.Language.Java11.value, 5),
+    (enums.Language.Python3.value, 7),
+    (enums.Language.PyPy3.value, 5),
+]
+__verdicts = [
+    (enums.Verdict.OK.value, 45),
+    (enums.Verdict.WRONG_ANSWER.value, 30),
+    (enums.Verdict.TIME_LIMIT_EXCEEDED.value, 12),
+    (enums.Verdict.RUNTIME_ERROR.value, 6),
+    (enums.Verdict.MEMORY_LIMIT_EXCEEDED.value, 3),
+    (enums.Verdict.COMPILATION_ERROR.value, 4),
+]
+__tags = [tag.value for tag in enums.Tag]
+__cpp_template = '''#include <bits/stdc++.h>
+using namespace std;
+typedef long long ll;
+#define all(x) (x).begin(), (x).end()
+
+int main() {{
+    ios_base::sync_with_stdio(false);
+    cin.tie(nullptr);
+    int {n};
+    cin >> {n};
+    vector<ll> {a}({n});
+    for (auto &x : {a}) cin >> x;
+{body}
+    return 0;
+}}
+'''
+__java_template = '''import java.util.*;
+import java.io.*;
+
+public class Main {{
+    public static void main(String[] args) throws IOException {{
+        BufferedReader br = new BufferedReader(new InputStreamReader(System.in));
+        int {n} = Integer.parseInt(br.readLine().trim());
+        long[] {a} = new long[{n}];
+{body}
+    }}
+}}
+'''
+__python_template = '''import sys
+input = sys.stdin.readline
+
+{n} = int(input())
+{a} = list(map(int, input().split()))
+{body}
+'''
+
+
+def __choose(rng: random.Random, weighted: list) -> str:
+    return rng.choices([value for value, _ in weighted], weights=[weight for _, weight in weighted])[0]
+
+
+def make_problems(contest_id: int, rng: random.Random, count: int = 6) -> List[dict]:
+    return [
+        {
+            'contestId': contest_id,
+            'index': chr(ord('A') + i),
+            'name': f'Synthetic Problem {chr(ord("A") + i)}',
+            'rating': min(800 + 300 * i + rng.randrange(0, 300, 100), 3500),
+            'tags': rng.sample(__tags, rng.randint(0, 4)),
+        }
+        for i in range(count)
+    ]
+
+
+def make_status(contest_id: int, size: int, seed: int = 0) -> List[dict]:
+    rng = random.Random(seed)
+    problems = make_problems(contest_id, rng)
+    # Easy problems get most of the submissions, like real rounds.
+    weights = [2 ** (len(problems) - i) for i in range(len(problems))]
+    result = []
+    for i in range(size):
+        result.append({
+            'id': contest_id * 100000 + i,
+            'contestId': contest_id,
+            'creationTimeSeconds': 1600000000 + i,
+            'relativeTimeSeconds': i,
+            'problem': rng.choices(problems, weights=weights)[0],
+            'author': {'members': [{'handle': f'user{rng.randrange(size)}'}], 'participantType': 'CONTESTANT'},
+            'programmingLanguage': __choose(rng, __languages),
+            'verdict': __choose(rng, __verdicts),
+            'testset': 'TESTS',
+            'passedTestCount': rng.randint(0, 100),
+            'timeConsumedMillis': rng.randint(15, 2000),
+            'memoryConsumedBytes': rng.randint(0, 256) * 1024 ** 2,
+        })
+    return result
+
+
+def make_contest(contest_id: int, size: int, seed: int = 0, **kwargs) -> Contest:
+    status = make_status(contest_id, size, seed)
+    if kwargs.get('eligible_only', False):
+        status = [s for s in status if s['verdict'] in Config()['Supported-Verdicts']]
+
+    problems = {}
+    submissions = {}
+    for raw_submission in status:
+        raw_problem = raw_submission['problem']
+        key = Problem.get_key(contest_id, raw_problem['index'])
+        if key not in problems:
+            problems[key] = Problem(contest_id=contest_id, info=raw_problem)
+        submission = Submission(contest_id=contest_id, problem=problems[key], info=raw_submission)
+        submissions[submission.id] = submission
+
+    return Contest(problems=problems, submissions=submissions, info={
+        'id': contest_id,
+        'name': f'Synthetic Round {contest_id}',
+        'type': enums.Type.CF.value,
+        'phase': enums.Phase.FINISHED.value,
+        'frozen': 'false',
+        'durationSeconds': 7200,
+        'startTimeSeconds': 1600000000,
+        'relativeTimeSeconds': 7200,
+    })
+
+
+def make_source(language: str, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    n, a = rng.choice(['n', 'm', 'k', 'cnt']), rng.choice(['a', 'arr', 'v', 'nums'])
+    lines = rng.randint(5, 60)
+    if 'java' in language.lower():
+        body = '\n'.join(f'        {a}[{i % 7}] += {rng.randint(0, 10 ** 9)}L;' for i in range(lines))
+        template = __java_template
+    elif 'py' in language.lower():
+        body = '\n'.join(f'{a}[{i % 7} % {n}] += {rng.randint(0, 10 ** 9)}' for i in range(lines)) + f'\nprint(sum({a}))'
+        template = __python_template
+    else:
+        body = '\n'.join(f'    {a}[{i % 7} % {n}] += {rng.randint(0, 10 ** 9)};\r\n' for i in range(lines))
+        body += f'    cout << accumulate(all({a}), 0LL) << "\\n";'
+        template = __cpp_template
+    return template.format(n=n, a=a, body=body)
@@ -1,4 +1,7 @@
 import yoink.utils
+from yoink.dedup import NearDuplicateIndex
+from yoink.normalizer import Normalizer
+from yoink.utils import Config
 from yoink.yanker import Yanker
 
 # TODO:
@@ -7,5 +10,14 @@ from yoink.yanker import Yanker
 if __name__ == '__main__':
     #yoink.utils.merge_data_sources('D://Yoink-Data-Java', 'D://Yoink-Data-Cpp')
     yanker = Yanker(download=True)
-    for contest in yanker.contests.values():
+    dedup_index = NearDuplicateIndex() if Config()['Dedup-On-Download'] else None
+    normalizer = Normalizer() if Config()['Normalize-On-Download'] else None
+    contests = yanker.stream() if Config()['Stream-Contests'] else yanker.contests.values()
+    for contest in contests:
         contest.download_source_code()
+        if normalizer:
+            normalizer.run([contest.id])
+        if dedup_index:
+            dedup_index.update([contest.id])
+    if dedup_index:
+        dedup_index.dump_clusters()
@@ -0,0 +1,86 @@
+import os
+import json
+import time
+import multiprocessing
+import pytest
+
+__nodes = 8
+__keys = [f'contest-1-{i}' for i in range(50)]
+
+
+def claim_all(directory: str, keys: list, barrier, results) -> None:
+    os.chdir(directory)
+    from yoink.coordinator import Coordinator
+    barrier.wait()
+    results.put((Coordinator().node, [key for key in keys if Coordinator().claim(key)]))
+
+
+def run_nodes(directory: str, keys: list) -> dict:
+    context = multiprocessing.get_context('spawn')
+    barrier = context.Barrier(__nodes)
+    results = context.Queue()
+    processes = [context.Process(target=claim_all, args=(directory, keys, barrier, results)) for _ in range(__nodes)]
+    for process in processes:
+        process.start()
+    claimed = dict(results.get(timeout=60) for _ in processes)
+    for process in processes:
+        process.join(timeout=60)
+    return claimed
+
+
+@pytest.fixture
+def directory(tmp_path):
+    os.makedirs(tmp_path / 'yoink')
+    with open(tmp_path / 'yoink' / 'config', 'w') as fp:
+        json.dump({
+            'Path-Prefix': str(tmp_path),
+            'Yoink-Path': 'data',
+            'Coordinate-Nodes': True,
+            'Lease-Duration': 60,
+            'Progress-Mode': 'none',
+        }, fp)
+    return str(tmp_path)
+
+
+def test_claims_are_exclusive(directory):
+    claimed = run_nodes(directory, __keys)
+    winners = [key for keys in claimed.values() for key in keys]
+    assert sorted(winners) == sorted(__keys)
+
+
+def test_stale_leases_are_reclaimed_once(directory):
+    leases = os.path.join(directory, 'data', '.leases')
+    os.makedirs(leases)
+    for key in __keys:
+        with open(os.path.join(leases, f'{key}.lease'), 'w') as fp:
+            json.dump({'Node': 'dead-node', 'Expires': time.time() - 1}, fp)
+
+    claimed = run_nodes(directory, __keys)
+    winners = [key for keys in claimed.values() for key in keys]
+    assert sorted(winners) == sorted(__keys)
+    for node, keys in claimed.items():
+        for key in keys:
+            with open(os.path.join(leases, f'{key}.lease'), 'r') as fp:
+                assert json.load(fp)['Node'] == node
+
+
+def test_fresh_leases_are_kept(directory):
+    leases = os.path.join(directory, 'data', '.leases')
+    os.makedirs(leases)
+    for key in __keys:
+        with open(os.path.join(leases, f'{key}.lease'), 'w') as fp:
+            json.dump({'Node': 'live-node', 'Expires': time.time() + 60}, fp)
+
+    claimed = run_nodes(directory, __keys)
+    assert not any(claimed.values())
+
+
+def test_done_parts_are_not_claimed(directory):
+    leases = os.path.join(directory, 'data', '.leases')
+    os.makedirs(leases)
+    for key in __keys[:10]:
+        open(os.path.join(leases, f'{key}.done'), 'w').close()
+
+    claimed = run_nodes(directory, __keys)
+    winners = [key for keys in claimed.values() for key in keys]
+    assert sorted(winners) == sorted(__keys[10:])
@@ -0,0 +1,213 @@
+import os
+import json
+import time
+import zlib
+import hashlib
+import requests
+import threading
+from collections import OrderedDict
+from typing import Optional
+from yoink.session import Session, is_redirecting
+from yoink.utils import Singleton, Config, OPE, OPJ
+
+
+class ResponseCache(metaclass=Singleton):
+    __policies = ['LRU', 'FIFO']
+
+    def __init__(self):
+        self.entries = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.__scanned = False
+        # The contest prefetch thread reads and writes the cache alongside the main thread.
+        self.__lock = threading.RLock()
+
+    @property
+    def enabled(self) -> bool:
+        return Config()['Cache-Responses'] or Config()['Reprocess-From-Cache']
+
+    @property
+    def path(self) -> str:
+        return OPJ(Config()['Path-Prefix'], Config()['Cache-Path'])
+
+    @property
+    def policy(self) -> str:
+        policy = str(Config()['Cache-Eviction-Policy']).upper()
+        return policy if policy in ResponseCache.__policies else 'LRU'
+
+    @staticmethod
+    def get_key(url: str, params: Optional[dict] = None) -> str:
+        if params:
+            url = requests.Request('GET', url, params=params).prepare().url
+        return hashlib.sha1(url.encode('utf-8')).hexdigest()
+
+    def get_entry_path(self, key: str) -> str:
+        return OPJ(self.path, key[:2], key)
+
+    def contains(self, url: str, params: Optional[dict] = None) -> bool:
+        with self.__lock:
+            if not self.enabled:
+                return False
+            self.__scan()
+            return ResponseCache.get_key(url, params) in self.entries
+
+    def get(self, url: str, params: Optional[dict] = None, max_age=None) -> Optional[requests.Response]:
+        with self.__lock:
+            if not self.enabled:
+                return None
+            self.__scan()
+
+            key = ResponseCache.get_key(url, params)
+            if key not in self.entries:
+                self.misses += 1
+                return None
+
+            path = self.get_entry_path(key)
+            try:
+                with open(path, 'rb') as fp:
+                    header, body = fp.read().split(b'\n', 1)
+                header = json.loads(header)
+                content = zlib.decompress(body)
+            except (OSError, ValueError, zlib.error):
+                self.__discard(key)
+                self.misses += 1
+                return None
+
+            # Replaying a cache serves whatever was recorded, however old.
+            if max_age is not None and max_age >= 0 and not Config()['Reprocess-From-Cache'] and \
+                    time.time() - header.get('Time', 0) > max_age:
+                self.misses += 1
+                return None
+
+            if self.policy == 'LRU':
+                self.entries.move_to_end(key)
+                os.utime(path)
+
+            self.hits += 1
+            response = requests.Response()
+            response._content = content
+            response.status_code = header['Status']
+            response.encoding = header['Encoding']
+            response.url = header['Url']
+            return response
+
+    def put(self, response: requests.Response, url: str, params: Optional[dict] = None) -> None:
+        with self.__lock:
+            if not self.enabled or not response.ok:
+                return
+            self.__scan()
+
+            key = ResponseCache.get_key(url, params)
+            header = json.dumps({
+                'Url': response.url,
+                'Status': response.status_code,
+                'Encoding': response.encoding,
+                'Time': int(time.time()),
+            }).encode('utf-8')
+            data = header + b'\n' + zlib.compress(response.content, Config()['Cache-Compression-Level'])
+
+            path = self.get_entry_path(key)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'wb') as fp:
+                fp.write(data)
+
+            self.__discard(key, remove=False)
+            self.entries[key] = len(data)
+            self.size += len(data)
+            self.__evict()
+
+    def discard(self, url: str, params: Optional[dict] = None) -> None:
+        with self.__lock:
+            if not self.enabled:
+                return
+            self.__scan()
+            self.__discard(ResponseCache.get_key(url, params))
+
+    def __discard(self, key: str, remove=True) -> None:
+        size = self.entries.pop(key, None)
+        if size is not None:
+            self.size -= size
+        if remove and OPE(self.get_entry_path(key)):
+            os.remove(self.get_entry_path(key))
+
+    def __evict(self) -> None:
+        max_size = Config()['Cache-Max-Size']
+        if max_size < 0:
+            return
+        while self.size > max_size and len(self.entries) > 1:
+            key = next(iter(self.entries))
+            self.__discard(key)
+
+    def __scan(self) -> None:
+        if self.__scanned:
+            return
+        self.__scanned = True
+        if not OPE(self.path):
+            return
+
+        found = []
+        for bucket in os.scandir(self.path):
+            if not bucket.is_dir():
+                continue
+            for entry in os.scandir(bucket.path):
+                if entry.is_file():
+                    stat = entry.stat()
+                    found.append((stat.st_mtime if self.policy == 'LRU' else stat.st_ctime, entry.name, stat.st_size))
+
+        for _, key, size in sorted(found):
+            self.entries[key] = size
+            self.size += size
+        self.__evict()
+
+
+class RateLimiter(metaclass=Singleton):
+    def __init__(self):
+        self.next = 0.0
+        self.__lock = threading.Lock()
+
+    def wait(self) -> None:
+        # Slots are handed out under the lock, so threads together stay within one request per Request-Delay.
+        with self.__lock:
+            now = time.monotonic()
+            start = max(now, self.next)
+            self.next = start + Config()['Request-Delay']
+        if start > now:
+            time.sleep(start - now)
+
+
+def request(url: str, **kwargs) -> requests.Response:
+    params = kwargs.pop('params', None)
+    delay = kwargs.pop('delay', True)
+    max_age = kwargs.pop('max_age', None)
+    store = kwargs.pop('store', True)
+
+    response = ResponseCache().get(url, params, max_age)
+    if response is not None:
+        return response
+
+    if Config()['Reprocess-From-Cache']:
+        response = requests.Response()
+        response._content = b''
+        response.status_code = 404
+        response.url = url
+        return response
+
+    if delay:
+        RateLimiter().wait()
+    response = Session().get(url, params=params, **kwargs)
+
+    retries = Config()['Redirect-Retries']
+    while is_redirecting(response) and retries > 0:
+        retries -= 1
+        href = Session().solve(response)
+        if not href:
+            break
+        kwargs['allow_redirects'] = True
+        if delay:
+            RateLimiter().wait()
+        response = Session().get(href, **kwargs)
+
+    if store and not is_redirecting(response):
+        ResponseCache().put(response, url, params)
+    return response
@@ -0,0 +1,118 @@
+import json
+from typing import Any, Optional, List
+from yoink.problem import Problem
+from yoink.utils import Config, OPE
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+SCHEMA_VERSION = 3
+
+
+class Codec:
+    name = str()
+    extension = str()
+
+    @property
+    def available(self) -> bool:
+        return True
+
+    def dumps(self, obj: Any) -> bytes:
+        raise NotImplementedError
+
+    def loads(self, data: bytes) -> Any:
+        raise NotImplementedError
+
+
+class JsonCodec(Codec):
+    name = 'json'
+    extension = 'json'
+
+    def dumps(self, obj: Any) -> bytes:
+        indent = Config()['Meta-Indent']
+        if orjson and not indent:
+            return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+        if indent:
+            return json.dumps(obj, indent=indent).encode('utf-8')
+        return json.dumps(obj, separators=(',', ':')).encode('utf-8')
+
+    def loads(self, data: bytes) -> Any:
+        if orjson:
+            return orjson.loads(data)
+        return json.loads(data)
+
+
+class MsgpackCodec(Codec):
+    name = 'msgpack'
+    extension = 'msgpack'
+
+    @property
+    def available(self) -> bool:
+        return msgpack is not None
+
+    def dumps(self, obj: Any) -> bytes:
+        return msgpack.packb(obj, use_bin_type=True)
+
+    def loads(self, data: bytes) -> Any:
+        return msgpack.unpackb(data, raw=False, strict_map_key=False)
+
+
+__codecs = {codec.name: codec for codec in [JsonCodec(), MsgpackCodec()]}
+
+
+def get_codecs() -> List[Codec]:
+    return [codec for codec in __codecs.values() if codec.available]
+
+
+def get_codec(name: Optional[str] = None) -> Codec:
+    codec = __codecs.get(name or Config()['Meta-Codec'], None)
+    if not codec or not codec.available:
+        return __codecs['json']
+    return codec
+
+
+def dump(obj: Any, path: str, codec: Optional[Codec] = None) -> None:
+    codec = codec or get_codec()
+    with open(path, 'wb') as fp:
+        fp.write(codec.dumps(obj))
+
+
+def load(path: str, codec: Optional[Codec] = None) -> Any:
+    codec = codec or get_codec()
+    with open(path, 'rb') as fp:
+        return codec.loads(fp.read())
+
+
+def find(path_extensionless: str) -> Optional[tuple]:
+    for codec in [get_codec(), *get_codecs()]:
+        path = f'{path_extensionless}.{codec.extension}'
+        if OPE(path):
+            return path, codec
+    return None
+
+
+def upgrade(data: dict) -> dict:
+    version = data.get('Schema-Version', 1)
+    if version < 3:
+        # Before version 3 problems were not stored, every submission carried its problem's tags.
+        problems = {}
+        for serialized_submission in data['Submissions'].values():
+            index = serialized_submission.get('Problem-Index', str())
+            if not index:
+                continue
+            key = Problem.get_key(serialized_submission['Contest-Id'], index)
+            if key not in problems:
+                problems[key] = {
+                    'Contest-Id': serialized_submission['Contest-Id'],
+                    'Index': index,
+                    'Tags': serialized_submission.get('Tags', []),
+                }
+        data = {**data, 'Problems': problems, 'Schema-Version': SCHEMA_VERSION}
+    return data
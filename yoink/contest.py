@@ -1,19 +1,29 @@
 from __future__ import annotations
 
+import os
 import datetime
 import json
-import time
-import requests
-from tqdm import tqdm
-from typing import Optional, List
-from functools import cached_property, lru_cache
-from yoink import enums
+from typing import Optional, List, Tuple
+from functools import cached_property
+from yoink import codec, enums
+from yoink.cache import ResponseCache, request
+from yoink.coordinator import Coordinator
+from yoink.events import Progress, track
+from yoink.layout import Layout
+from yoink.pager import Pager
+from yoink.problem import Problem
+from yoink.scheduler import Scheduler
 from yoink.submission import Submission
-from yoink.utils import cc2sc, Config, OPE, OMD, TqdmControl
+from yoink.utils import cc2sc, chunkenize, Config, OPE, OPS
 from yoink.utils import check_consecutive_timeouts, reset_timeout_counter
 
 
 class Contest:
+    __status_precedence = [
+        enums.DownloadStatus.NOT_STARTED.value,
+        enums.DownloadStatus.FAILED.value,
+        enums.DownloadStatus.FINISHED.value,
+    ]
     __optional_fields = [
         'preparedBy',
         'websiteUrl',
@@ -32,6 +42,12 @@ class Contest:
         if not instance:
             return None
 
+        problems = {}
+        for problem_instance in instance.problems.values():
+            string = Problem.serialize(instance=problem_instance)
+            if string:
+                problems[problem_instance.key] = string
+
         submissions = {}
         for submission_instance in instance.submissions.values():
             string = Submission.serialize(instance=submission_instance)
@@ -41,6 +57,7 @@ class Contest:
         # TODO: don't serialize empty fields.
         return \
             {
+                'Schema-Version': codec.SCHEMA_VERSION,
                 'Id': instance.id,
                 'Name': instance.name,
                 'Type': instance.type,
@@ -49,6 +66,7 @@ class Contest:
                 'Duration': instance.duration_seconds,
                 'Start-Time': instance.start_time_seconds,
                 'Relative-Time': instance.relative_time_seconds,
+                'Problems': problems,
                 'Submissions': submissions,
             }
 
@@ -56,22 +74,30 @@ class Contest:
     def deserialize(**kwargs) -> Optional[Contest]:
         string = kwargs.get('string', None)
         path = kwargs.get('path', None)
-        if string:
+        data = kwargs.get('data', None)
+        if data is None and string:
             data = json.loads(string)
-        elif path and OPE(path):
-            with open(path, 'r') as fp:
-                data = json.load(fp)
-        else:
+        elif data is None and path and (found := codec.find(OPS(path)[0])):
+            data = codec.load(*found)
+        if data is None:
             return None
+        data = codec.upgrade(data)
+
+        problems = {}
+        for serialized_problem in data.get('Problems', {}).values():
+            problem = Problem.deserialize(data=serialized_problem)
+            if problem:
+                problems[problem.key] = problem
 
         submissions = {}
         for serialized_submission in data['Submissions'].values():
-            submission = Submission.deserialize(string=json.dumps(serialized_submission))
+            submission = Submission.deserialize(data=serialized_submission, problems=problems)
             if submission:
                 submissions[submission.id] = submission
 
         # TODO: check if key is present before accessing it.
         return Contest(download=kwargs.get('download', False),
+                       problems=problems,
                        submissions=submissions,
                        info={
                            'id': data['Id'],
@@ -91,7 +117,7 @@ class Contest:
 
         path = [str(contest_id)]
         if kwargs.get('meta', False):
-            path = [*path, 'meta.json']
+            path = [*path, f'meta.{codec.get_codec().extension}']
         return Config().combine_path(*path)
 
     def __init__(self, *args, **kwargs):
@@ -103,40 +129,102 @@ class Contest:
         self.duration_seconds = int()
         self.start_time_seconds = int()
         self.relative_time_seconds = int()
+        self.problems = kwargs.get('problems', {})
         self.submissions = kwargs.get('submissions', {})
+        self.__excluded_problems = {}
         if kwargs.get('info', None):
             self.__sync(kwargs['info'])
         if kwargs.get('download', False):
             self.__download_data()
 
-    @staticmethod
-    def __validate_submission(submission):
+    def __is_excluded(self, problem: Problem) -> bool:
+        if not problem.index:
+            return problem.is_excluded()
+        if problem.key not in self.__excluded_problems:
+            self.__excluded_problems[problem.key] = problem.is_excluded()
+        return self.__excluded_problems[problem.key]
+
+    def __validate_submission(self, submission):
         languages = Config()['Supported-Languages']
         return submission.language not in languages or \
-               any(map(lambda tag: tag in Config()['Excluded-Tags'], submission.tags)) or \
+               self.__is_excluded(submission.problem) or \
                submission.download_status == enums.DownloadStatus.FINISHED.value and \
                submission.validate_code(fixup=True)
 
     def download_source_code(self) -> None:
-        max_submissions = Config()['Max-Submissions']
-        submissions = list(filter(lambda s: not Contest.__validate_submission(s), self.submissions.values()))
-        size = len(submissions)
-        size = size if max_submissions <= 0 else min(size, max_submissions)
-        submissions = list(submissions)[:size]
+        coordinator = Coordinator()
+        if not coordinator.enabled:
+            self.__download_source_code(list(self.submissions.values()))
+            Scheduler().finish(self.id)
+            Layout().invalidate(self.id)
+            return
+
+        # Like the uncoordinated path, a non-positive Max-Submissions means no limit.
+        budget = Config()['Max-Submissions'] if Config()['Max-Submissions'] > 0 else -1
+        for ids in chunkenize(sorted(self.submissions.keys()), max(Config()['Lease-Submissions'], 1)):
+            # Keyed by id range, so parts stay meaningful when After-Update adds submissions.
+            key = f'contest-{self.id}-{ids[0]}-{ids[-1]}'
+            if budget == 0 or not coordinator.claim(key):
+                continue
+            spent, finished = self.__download_source_code([self.submissions[i] for i in ids], budget, key)
+            coordinator.release(key, done=finished)
+            budget = budget if budget < 0 else max(budget - spent, 0)
+        # State kept for finished contests is not needed again, keep memory flat while streaming.
+        Scheduler().finish(self.id)
+        Layout().invalidate(self.id)
+
+    def __is_settled(self, submission) -> bool:
+        return submission.language not in Config()['Supported-Languages'] or \
+               self.__is_excluded(submission.problem) or \
+               submission.download_status == enums.DownloadStatus.FINISHED.value
+
+    def __download_source_code(self, submissions: list, budget=None, lease=None) -> Tuple[int, bool]:
+        max_submissions = Config()['Max-Submissions'] if budget is None else budget
+        part = submissions
+        scheduler = Scheduler()
+        if lease:
+            # Other nodes may have written into this contest since it was last listed.
+            Layout().invalidate(self.id)
+        if Config()['Reprocess-From-Cache']:
+            submissions = list(filter(lambda s: s.language in Config()['Supported-Languages'] and
+                                                ResponseCache().contains(s.url), submissions))
+        else:
+            candidates = []
+            for submission in submissions:
+                if not self.__validate_submission(submission):
+                    candidates.append(submission)
+                elif submission.download_status == enums.DownloadStatus.FINISHED.value:
+                    scheduler.register(submission)
+            submissions = candidates
+        replaying = Config()['Reprocess-From-Cache']
+        # Quotas save request budget, a replay from the cache makes no requests to save.
+        scheduled = submissions if replaying else \
+            scheduler.schedule(submissions, max_submissions if max_submissions > 0 else -1)
+        spent = 0
+        Layout().ensure(self.id, [submission.language for submission in scheduled])
         now = datetime.datetime.now()
-        for submission in tqdm(submissions,
-                               total=len(submissions),
-                               position=0,
-                               leave=True,
-                               desc=f'[{self.id}][{now.hour:02d}:{now.minute:02d}] Downloading code'):
+        for submission in track(scheduled,
+                                desc=f'[{self.id}][{now.hour:02d}:{now.minute:02d}] Downloading code',
+                                fields={'Contest': self.id}):
 
             if check_consecutive_timeouts():
                 reset_timeout_counter(reset_consecutive=True)
                 break
 
+            if lease and not Coordinator().renew(lease):
+                break
+
             self.submissions[submission.id].download_status = submission.download_source_code().value
+            if not replaying:
+                scheduler.record(submission, submission.download_status)
+            spent += 1
             self.__dump()
 
+        if not replaying:
+            scheduler.report(title=f'Request budget after [{self.id}]')
+        # Failed and unscheduled submissions keep the part open for the next run.
+        return spent, all(self.__is_settled(self.submissions[s.id]) for s in part)
+
     def __sync(self, info) -> None:
         self.id = info['id']
         self.name = info['name']
@@ -151,32 +239,72 @@ class Contest:
                 self.__setattr__(cc2sc(key), info[key])
 
     def __ensure_directories(self) -> None:
-        path = Contest.get_path(self.id)
-        if path and not OPE(path):
-            OMD(path)
+        if self.id:
+            Layout().ensure(self.id)
 
     def __download_data(self) -> None:
         for raw_submission in self.__eligible_raw_submissions:
             submission_id = raw_submission['id']
             if submission_id not in self.submissions:
                 self.submissions[submission_id] = Submission(contest_id=self.id,
-                                                             info=raw_submission)
+                                                             info=raw_submission,
+                                                             problem=self.__get_problem(raw_submission['problem']))
+        self.__dict__.pop('_Contest__eligible_raw_submissions', None)
         self.__dump()
 
+    def __get_problem(self, raw_problem) -> Problem:
+        key = Problem.get_key(self.id, raw_problem.get('index', str()))
+        if key not in self.problems:
+            self.problems[key] = Problem(contest_id=self.id, info=raw_problem)
+        return self.problems[key]
+
     def __dump(self) -> None:
         self.__ensure_directories()
-        string = Contest.serialize(instance=self)
-        if string:
-            path = Contest.get_path(self.id, meta=True)
-            if path:
-                with open(path, 'w+') as fp:
-                    json.dump(string, fp, indent=4)
+        path = Contest.get_path(self.id, meta=True)
+        if not path:
+            return
+
+        with Coordinator().lock(f'meta-{self.id}'):
+            if Coordinator().enabled:
+                self.__merge(path)
+            string = Contest.serialize(instance=self)
+            if string:
+                temp_path = f'{path}.{Coordinator().node}.tmp'
+                codec.dump(string, temp_path)
+                os.replace(temp_path, path)
+
+                # Drop metadata left over in a previously configured format.
+                for other in codec.get_codecs():
+                    other_path = f'{OPS(path)[0]}.{other.extension}'
+                    if other_path != path and OPE(other_path):
+                        os.remove(other_path)
+
+    def __merge(self, path: str) -> None:
+        found = codec.find(OPS(path)[0])
+        if not found:
+            return
+
+        data = codec.upgrade(codec.load(*found))
+        for serialized_problem in data.get('Problems', {}).values():
+            problem = Problem.deserialize(data=serialized_problem)
+            if problem and problem.key not in self.problems:
+                self.problems[problem.key] = problem
 
-    @staticmethod
-    def __is_eligible(raw_submission) -> bool:
+        for serialized_submission in data['Submissions'].values():
+            submission = self.submissions.get(serialized_submission['Id'], None)
+            if not submission:
+                submission = Submission.deserialize(data=serialized_submission, problems=self.problems)
+                if submission:
+                    self.submissions[submission.id] = submission
+            elif Contest.__status_precedence.index(serialized_submission['Download-Status']) > \
+                    Contest.__status_precedence.index(submission.download_status):
+                # A download another node finished must not be overwritten by a local failure.
+                submission.download_status = serialized_submission['Download-Status']
+
+    def __is_eligible(self, raw_submission) -> bool:
         try:
             return \
-                not any(map(lambda tag: tag in Config()['Excluded-Tags'], raw_submission['problem']['tags'])) and \
+                not self.__is_excluded(self.__get_problem(raw_submission['problem'])) and \
                 raw_submission['verdict'] in Config()['Supported-Verdicts'] \
                 and (raw_submission['programmingLanguage'] in Config()['Supported-Languages'] or
                      len(Config()['Supported-Languages']) == 0)
@@ -187,41 +315,32 @@ class Contest:
     def __eligible_raw_submissions(self) -> List[dict]:
         result = []
         current_index = 1
-        batch_size = 20000
+        pager = Pager()
         max_submissions = Config()['Max-Submissions']
-        progress_bar = None
-        indent = '\t' * TqdmControl().indent
-        last = 0
-        if max_submissions > 0:
-            progress_bar = tqdm(total=max_submissions,
-                                position=TqdmControl().pos,
-                                leave=True,
-                                bar_format=f'{indent}[{self.id}] Updating metadata')
-            progress_bar.desc = f'{indent}\tFiltering submissions'
-            progress_bar.bar_format = '{l_bar}{bar}| {n_fmt}/{total_fmt} [{elapsed}, {rate_fmt}{postfix}]'
+        progress = Progress(total=max_submissions if max_submissions > 0 else None,
+                            desc=f'[{self.id}] Filtering submissions',
+                            fields={'Contest': self.id})
         while len(result) < max_submissions or max_submissions == -1:
-            raw_submissions = self.__request_raw_submissions(self.id, current_index, batch_size)
+            need = max_submissions - len(result) if max_submissions >= 0 else -1
+            count = pager.page_size(self.id, need, current_index)
+            raw_submissions, size = self.__request_raw_submissions(self.id, current_index, count)
+            pager.remember(self.id, current_index, count)
             if len(raw_submissions) == 0:
                 break
 
-            raw_submissions = self.__filter_raw_submissions(raw_submissions,
-                                                            apply_config_constraints=True)
-            for submission in raw_submissions:
-                result.append(submission)
-
-            if progress_bar:
-                current = min(len(result), max_submissions)
-                progress_bar.update(current - last)
-                time.sleep(0.1)
-                last = current
+            eligible = self.__filter_raw_submissions(raw_submissions)
+            ingested = eligible[:need] if need >= 0 else eligible
+            result += ingested
+            pager.record(self.id, requests=1, rows=len(raw_submissions), bytes=size,
+                         eligible=len(eligible), ingested=len(ingested))
 
-            current_index += batch_size
+            progress.set(min(len(result), max_submissions) if max_submissions > 0 else len(result))
+            if len(raw_submissions) < count:
+                break
+            current_index += count
 
-        if progress_bar:
-            progress_bar.bar_format = f'{indent}Finished updating'
-            progress_bar.refresh()
-            time.sleep(0.1)
-            progress_bar.close()
+        progress.close()
+        pager.report(self.id)
         return result
 
     def __filter_raw_submissions(self, *args, **kwargs) -> List[dict]:
@@ -229,7 +348,7 @@ class Contest:
         if not isinstance(data, list):
             data = list(data)
 
-        result = list(filter(lambda x: Contest.__is_eligible(x), data))
+        result = list(filter(lambda x: self.__is_eligible(x), data))
 
         if kwargs.get('apply_config_constraints', False):
             max_submissions = Config()['Max-Submissions']
@@ -238,19 +357,15 @@ class Contest:
 
         return result
 
-    @lru_cache
-    def __request_raw_submissions(self, contest_id: int, start: int, count: int) -> List[dict]:
+    def __request_raw_submissions(self, contest_id: int, start: int, count: int) -> Tuple[List[dict], int]:
         payload = {'contestId': contest_id, 'from': start, 'count': count}
-        r = requests.get('https://codeforces.com/api/contest.status',
-                         # headers=Config()['GET-Headers'],
-                         # allow_redirects=False,
-                         params=payload)
+        r = request('https://codeforces.com/api/contest.status',
+                    # headers=Config()['GET-Headers'],
+                    # allow_redirects=False,
+                    params=payload,
+                    max_age=Config()['Cache-API-Max-Age'] if Config()['After-Update'] else None)
 
-        try:
-            r.raise_for_status()
-        except requests.HTTPError:
-            time.sleep(Config()['Request-Delay'])
-            return []
+        if not r.ok:
+            return [], len(r.content)
 
-        time.sleep(Config()['Request-Delay'])
-        return r.json()['result']
+        return r.json()['result'], len(r.content)
@@ -0,0 +1,124 @@
+import os
+import json
+import time
+import socket
+from contextlib import contextmanager
+from typing import Optional
+from yoink.utils import Singleton, Config, OPE, OPJ
+
+
+class Coordinator(metaclass=Singleton):
+    def __init__(self):
+        self.node = Config()['Node-Id'] or f'{socket.gethostname()}-{os.getpid()}'
+        self.held = {}
+
+    @property
+    def enabled(self) -> bool:
+        return Config()['Coordinate-Nodes']
+
+    @property
+    def path(self) -> str:
+        return Config().combine_path(Config()['Lease-Path'])
+
+    def get_lease_path(self, key: str) -> str:
+        return OPJ(self.path, f'{key}.lease')
+
+    def get_done_path(self, key: str) -> str:
+        return OPJ(self.path, f'{key}.done')
+
+    def __write_lease(self, path: str, duration: float, exclusive: bool) -> bool:
+        flags = os.O_WRONLY | os.O_CREAT | (os.O_EXCL if exclusive else os.O_TRUNC)
+        try:
+            fd = os.open(path, flags, 0o644)
+        except FileExistsError:
+            return False
+        with os.fdopen(fd, 'w') as fp:
+            json.dump({'Node': self.node, 'Expires': time.time() + duration}, fp)
+        return True
+
+    def __read_lease(self, path: str) -> Optional[dict]:
+        try:
+            with open(path, 'r') as fp:
+                return json.load(fp)
+        except (OSError, ValueError):
+            return None
+
+    def __reclaim(self, path: str) -> bool:
+        lease = self.__read_lease(path)
+        if lease is not None and lease.get('Expires', 0) > time.time():
+            return False
+        if lease is None and OPE(path) and os.path.getmtime(path) + Config()['Lease-Duration'] > time.time():
+            return False
+        stale_path = f'{path}.{self.node}.stale'
+        try:
+            os.rename(path, stale_path)
+        except OSError:
+            return False
+
+        lease = self.__read_lease(stale_path)
+        if lease is not None and lease.get('Expires', 0) > time.time():
+            # Another node reclaimed the lease between our read and rename, put it back.
+            try:
+                os.link(stale_path, path)
+            except OSError:
+                pass
+            os.remove(stale_path)
+            return False
+        os.remove(stale_path)
+        return True
+
+    def is_done(self, key: str) -> bool:
+        return OPE(self.get_done_path(key))
+
+    def claim(self, key: str, duration: Optional[float] = None) -> bool:
+        if not self.enabled:
+            return True
+        if self.is_done(key):
+            return False
+
+        duration = Config()['Lease-Duration'] if duration is None else duration
+        os.makedirs(self.path, exist_ok=True)
+        path = self.get_lease_path(key)
+        if not self.__write_lease(path, duration, exclusive=True):
+            if not self.__reclaim(path) or not self.__write_lease(path, duration, exclusive=True):
+                return False
+        self.held[key] = (time.time(), duration)
+        return True
+
+    def renew(self, key: str) -> bool:
+        if not self.enabled or key not in self.held:
+            return True
+        claimed, duration = self.held[key]
+        if time.time() - claimed < duration / 2:
+            return True
+
+        lease = self.__read_lease(self.get_lease_path(key))
+        if not lease or lease.get('Node') != self.node:
+            self.held.pop(key)
+            return False
+        self.__write_lease(self.get_lease_path(key), duration, exclusive=False)
+        self.held[key] = (time.time(), duration)
+        return True
+
+    def release(self, key: str, done=False) -> None:
+        if not self.enabled:
+            return
+        if done:
+            with open(self.get_done_path(key), 'w') as fp:
+                fp.write(self.node)
+        if self.held.pop(key, None) is not None:
+            lease = self.__read_lease(self.get_lease_path(key))
+            if lease and lease.get('Node') == self.node:
+                os.remove(self.get_lease_path(key))
+
+    @contextmanager
+    def lock(self, key: str):
+        if not self.enabled:
+            yield
+            return
+        while not self.claim(key, duration=Config()['Lock-Duration']):
+            time.sleep(0.05)
+        try:
+            yield
+        finally:
+            self.release(key)
@@ -0,0 +1,203 @@
+from __future__ import annotations
+
+import os
+import json
+import struct
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, List, Dict, Tuple
+from yoink import normalizer
+from yoink.utils import Config, OPE, OPJ, OPS, chunkenize
+
+__keywords = frozenset([
+    'auto', 'bool', 'break', 'case', 'catch', 'char', 'class', 'const', 'continue', 'default', 'define',
+    'delete', 'do', 'double', 'else', 'enum', 'extends', 'false', 'final', 'float', 'for', 'if', 'implements',
+    'import', 'include', 'int', 'long', 'namespace', 'new', 'null', 'nullptr', 'private', 'public', 'return',
+    'short', 'signed', 'sizeof', 'static', 'std', 'string', 'struct', 'switch', 'template', 'this', 'throw',
+    'true', 'try', 'typedef', 'typename', 'unsigned', 'using', 'vector', 'void', 'while',
+    'and', 'def', 'elif', 'from', 'in', 'is', 'lambda', 'not', 'or', 'pass', 'print', 'range', 'None', 'True',
+    'False', 'self', 'with', 'yield',
+])
+__mersenne_prime = (1 << 61) - 1
+__max_hash = (1 << 32) - 1
+
+
+def tokenize(text: str, language: str) -> List[str]:
+    tokens = normalizer.tokenize(normalizer.normalize(text, language))
+    return [token if token in __keywords or not (token[0].isalpha() or token[0] == '_') else 'v'
+            for token in tokens]
+
+
+def shingle(tokens: List[str], size: int) -> set:
+    if len(tokens) < size:
+        return {' '.join(tokens)} if tokens else set()
+    return {' '.join(tokens[i:i + size]) for i in range(len(tokens) - size + 1)}
+
+
+def get_permutations(num_perm: int, seed: int) -> List[Tuple[int, int]]:
+    result = []
+    for i in range(num_perm):
+        digest = hashlib.blake2b(struct.pack('<QQ', seed, i), digest_size=16).digest()
+        a, b = struct.unpack('<QQ', digest)
+        result.append((a % (__mersenne_prime - 1) + 1, b % __mersenne_prime))
+    return result
+
+
+def minhash(shingles: set, permutations: List[Tuple[int, int]]) -> List[int]:
+    if not shingles:
+        return [__max_hash] * len(permutations)
+    hashes = [struct.unpack('<I', hashlib.blake2b(s.encode('utf-8'), digest_size=4).digest())[0] for s in shingles]
+    return [min(((a * h + b) % __mersenne_prime) & __max_hash for h in hashes) for a, b in permutations]
+
+
+def estimate_similarity(lhs: List[int], rhs: List[int]) -> float:
+    if not lhs:
+        return 0.0
+    return sum(1 for x, y in zip(lhs, rhs) if x == y) / len(lhs)
+
+
+def sign_files(args) -> List[Tuple[str, str, List[int]]]:
+    paths, shingle_size, permutations = args
+    result = []
+    for key, language, path in paths:
+        try:
+            with open(path, 'r', encoding='utf-8') as fp:
+                text = fp.read()
+        except (OSError, UnicodeDecodeError):
+            continue
+        result.append((key, language, minhash(shingle(tokenize(text, language), shingle_size), permutations)))
+    return result
+
+
+class NearDuplicateIndex:
+    def __init__(self, *args, **kwargs):
+        self.num_perm = Config()['Dedup-Permutations']
+        self.bands = Config()['Dedup-Bands']
+        self.rows = self.num_perm // self.bands
+        self.shingle_size = Config()['Dedup-Shingle-Size']
+        self.threshold = Config()['Dedup-Threshold']
+        self.permutations = get_permutations(self.num_perm, Config()['Dedup-Seed'])
+        self.signatures: Dict[str, Tuple[str, List[int]]] = {}
+        self.buckets: Dict[Tuple[str, int, int], List[str]] = {}
+        self.contest_keys: Dict[str, List[str]] = {}
+        self.__loaded = set()
+        if kwargs.get('load', True):
+            self.load()
+
+    @property
+    def path(self) -> str:
+        return OPJ(Config()['Path-Prefix'], Config()['Dedup-Path'])
+
+    def get_contest_path(self, contest_id) -> str:
+        return OPJ(self.path, f'{contest_id}.json')
+
+    def load(self) -> None:
+        if not OPE(self.path):
+            return
+        for entry in os.scandir(self.path):
+            name, extension = OPS(entry.name)
+            if extension == '.json' and name.isdigit() and name not in self.__loaded:
+                with open(entry.path, 'r') as fp:
+                    data = json.load(fp)
+                if data.get('Permutations') != self.num_perm or data.get('Seed') != Config()['Dedup-Seed']:
+                    continue
+                self.__loaded.add(name)
+                for key, (language, signature) in data['Signatures'].items():
+                    self.__add(key, language, signature)
+
+    def __add(self, key: str, language: str, signature: List[int]) -> None:
+        if key not in self.signatures:
+            self.contest_keys.setdefault(key.split('/')[0], []).append(key)
+        self.signatures[key] = (language, signature)
+        for band in range(self.bands):
+            rows = tuple(signature[band * self.rows:(band + 1) * self.rows])
+            self.buckets.setdefault((language, band, hash(rows)), []).append(key)
+
+    def __list_pending(self, contest_id) -> List[Tuple[str, str, str]]:
+        result = []
+        contest_path = Config().combine_path(contest_id)
+        if not OPE(contest_path):
+            return result
+        for language_dir in os.scandir(contest_path):
+            if not language_dir.is_dir():
+                continue
+            for entry in os.scandir(language_dir.path):
+                name, extension = OPS(entry.name)
+                key = f'{contest_id}/{name}'
+                if entry.is_file() and extension != '.json' and key not in self.signatures:
+                    result.append((key, language_dir.name, entry.path))
+        return result
+
+    def update(self, contest_ids: Optional[list] = None) -> int:
+        if contest_ids is None:
+            contest_ids = [d for d in os.listdir(Config().working_dir_path) if d.isdigit()]
+
+        pending = {contest_id: self.__list_pending(contest_id) for contest_id in contest_ids}
+        paths = [path for contest_paths in pending.values() for path in contest_paths]
+        if not paths:
+            return 0
+
+        workers = Config()['Dedup-Workers'] if Config()['Dedup-Workers'] > 0 else os.cpu_count()
+        chunks = [(chunk, self.shingle_size, self.permutations) for chunk in chunkenize(paths, 256)]
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for signed in executor.map(sign_files, chunks):
+                for key, language, signature in signed:
+                    self.__add(key, language, signature)
+
+        for contest_id in pending:
+            self.__dump(contest_id)
+        return len(paths)
+
+    def __dump(self, contest_id) -> None:
+        signatures = {key: self.signatures[key] for key in self.contest_keys.get(str(contest_id), [])}
+        os.makedirs(self.path, exist_ok=True)
+        with open(self.get_contest_path(contest_id), 'w') as fp:
+            json.dump({
+                'Permutations': self.num_perm,
+                'Seed': Config()['Dedup-Seed'],
+                'Signatures': signatures,
+            }, fp)
+        self.__loaded.add(str(contest_id))
+
+    def clusters(self, threshold: Optional[float] = None) -> Dict[str, List[str]]:
+        threshold = self.threshold if threshold is None else threshold
+        parents = {}
+
+        def find(x):
+            while parents.get(x, x) != x:
+                parents[x] = parents.get(parents[x], parents[x])
+                x = parents[x]
+            return x
+
+        # Members are compared against a few representatives of the bucket, not against each other,
+        # so buckets full of template solutions stay linear.
+        limit = max(Config()['Dedup-Representatives'], 1)
+        for keys in self.buckets.values():
+            representatives = []
+            for key in keys:
+                for representative in representatives:
+                    lhs_root, rhs_root = find(representative), find(key)
+                    if lhs_root == rhs_root or \
+                            estimate_similarity(self.signatures[representative][1],
+                                                self.signatures[key][1]) >= threshold:
+                        parents[max(lhs_root, rhs_root)] = min(lhs_root, rhs_root)
+                        break
+                else:
+                    if len(representatives) < limit:
+                        representatives.append(key)
+
+        result = {}
+        for key in parents:
+            result.setdefault(find(key), []).append(key)
+        for root, members in result.items():
+            if root not in members:
+                members.append(root)
+            members.sort()
+        return result
+
+    def dump_clusters(self, threshold: Optional[float] = None) -> str:
+        path = OPJ(self.path, 'clusters.json')
+        os.makedirs(self.path, exist_ok=True)
+        with open(path, 'w') as fp:
+            json.dump(self.clusters(threshold), fp, indent=4)
+        return path
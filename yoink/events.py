@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+import sys
+import json
+import time
+import itertools
+import threading
+from typing import Callable, Iterable, Iterator
+from yoink.utils import Singleton, Config
+
+
+class EventBus(metaclass=Singleton):
+    def __init__(self):
+        self.subscribers = []
+        self.__lock = threading.Lock()
+        self.__local = threading.local()
+        self.__ids = itertools.count(1)
+        self.__configured = False
+
+    def subscribe(self, callback: Callable[[dict], None]) -> None:
+        with self.__lock:
+            self.subscribers.append(callback)
+
+    def emit(self, event: str, **fields) -> None:
+        self.__configure()
+        if not self.subscribers:
+            return
+        payload = {'Time': round(time.time(), 3), 'Event': event, **fields}
+        with self.__lock:
+            for callback in self.subscribers:
+                callback(payload)
+
+    def next_id(self) -> int:
+        return next(self.__ids)
+
+    @property
+    def stack(self) -> list:
+        if not hasattr(self.__local, 'stack'):
+            self.__local.stack = []
+        return self.__local.stack
+
+    def __configure(self) -> None:
+        if self.__configured:
+            return
+        self.__configured = True
+        mode = Config()['Progress-Mode']
+        if mode == 'json':
+            self.subscribers.append(JsonLinesRenderer())
+        elif mode == 'tqdm':
+            self.subscribers.append(TqdmRenderer())
+
+
+class Progress:
+    def __init__(self, *args, **kwargs):
+        self.id = EventBus().next_id()
+        self.desc = kwargs.get('desc', str())
+        self.total = kwargs.get('total', None)
+        self.fields = kwargs.get('fields', {})
+        self.n = 0
+        self.started = time.time()
+        self.__last_emit = 0.0
+        stack = EventBus().stack
+        self.parent = kwargs.get('parent', stack[-1] if stack else None)
+        self.depth = len(stack)
+        stack.append(self.id)
+        self.__emit('start')
+
+    def __enter__(self) -> Progress:
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def __emit(self, state: str, **fields) -> None:
+        self.__last_emit = time.time()
+        EventBus().emit('progress',
+                        Task=self.id,
+                        Parent=self.parent,
+                        Depth=self.depth,
+                        State=state,
+                        Desc=self.desc,
+                        N=self.n,
+                        Total=self.total,
+                        Elapsed=round(self.__last_emit - self.started, 3),
+                        **self.fields,
+                        **fields)
+
+    def update(self, n: int = 1, **fields) -> None:
+        self.n += n
+        if time.time() - self.__last_emit >= Config()['Progress-Interval']:
+            self.__emit('update', **fields)
+
+    def set(self, n: int, **fields) -> None:
+        self.update(n - self.n, **fields)
+
+    def close(self, **fields) -> None:
+        stack = EventBus().stack
+        if self.id in stack:
+            stack.remove(self.id)
+            self.__emit('finish', **fields)
+
+
+def track(iterable: Iterable, **kwargs) -> Iterator:
+    if kwargs.get('total', None) is None and hasattr(iterable, '__len__'):
+        kwargs['total'] = len(iterable)
+    with Progress(**kwargs) as progress:
+        for item in iterable:
+            yield item
+            progress.update()
+
+
+class JsonLinesRenderer:
+    def __init__(self, stream=None):
+        self.stream = stream or (sys.stdout if Config()['Progress-Stream'] == 'stdout' else sys.stderr)
+
+    def __call__(self, event: dict) -> None:
+        self.stream.write(json.dumps(event) + '\n')
+        self.stream.flush()
+
+
+class TqdmRenderer:
+    __bar_format = '{l_bar}{bar}| {n_fmt}/{total_fmt} [{elapsed}, {rate_fmt}{postfix}]'
+
+    @staticmethod
+    def __describe_paging(event: dict) -> str:
+        ingested = max(event['Ingested'], 1)
+        prefix = f'[{event["Contest"]}] contest.status' if event['Contest'] is not None else 'contest.status total'
+        return f'{prefix}: {event["Requests"]} requests, {event["Rows"]} rows, ' \
+               f'{event["Bytes"] / 1024 ** 2:.1f} MiB for {event["Ingested"]} submissions ' \
+               f'({event["Rows"] / ingested:.2f} rows, {event["Bytes"] / ingested / 1024:.1f} KiB per submission)'
+
+    @staticmethod
+    def __describe_schedule(event: dict) -> str:
+        lines = [f'\n======== {event["Title"]}: {event["Requests"]} requests ========',
+                 '* Outcomes: ' + (', '.join(f'{k}={v}' for k, v in event['Outcomes'].items()) or '-')]
+        for criterion, spent in event['Spent'].items():
+            lines.append(f'* {criterion}: ' + (', '.join(f'{k}={v}' for k, v in spent.items()) or '-'))
+        if event['Skipped']:
+            lines.append('* Skipped by quota: ' + ', '.join(f'{k}={v}' for k, v in event['Skipped'].items()))
+        return '\n'.join(lines) + '\n'
+
+    def __init__(self):
+        from tqdm import tqdm
+        self.tqdm = tqdm
+        self.bars = {}
+
+    def __call__(self, event: dict) -> None:
+        if event['Event'] == 'paging':
+            self.tqdm.write(TqdmRenderer.__describe_paging(event))
+        if event['Event'] == 'schedule':
+            self.tqdm.write(TqdmRenderer.__describe_schedule(event))
+        if event['Event'] != 'progress':
+            return
+        task = event['Task']
+        if event['State'] == 'start':
+            self.bars[task] = self.tqdm(total=event['Total'],
+                                        position=event['Depth'],
+                                        leave=True,
+                                        desc='\t' * event['Depth'] + event['Desc'],
+                                        bar_format=TqdmRenderer.__bar_format)
+        bar = self.bars.get(task, None)
+        if not bar:
+            return
+        bar.update(event['N'] - bar.n)
+        if event['State'] == 'finish':
+            bar.close()
+            self.bars.pop(task)
@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import os
+import threading
+from typing import Iterable, Optional, Set
+from yoink.utils import Singleton, Config, OPJ, ORE, ORM, shorten_programming_language
+
+
+class Layout(metaclass=Singleton):
+    def __init__(self):
+        self.root = None
+        self.languages = {}
+        self.directories = {}
+        self.created = set()
+        self.listings = {}
+        # Contest metadata is dumped from the prefetch thread while the main thread downloads code.
+        self.__lock = threading.RLock()
+
+    def __check_root(self) -> None:
+        root = Config().working_dir_path
+        if root != self.root:
+            with self.__lock:
+                self.root = root
+                self.directories.clear()
+                self.created.clear()
+                self.listings.clear()
+
+    def get_language(self, language: str) -> str:
+        if language not in self.languages:
+            self.languages[language] = shorten_programming_language(language)
+        return self.languages[language]
+
+    def get_directory(self, contest_id: int, language: Optional[str] = None) -> str:
+        self.__check_root()
+        key = (contest_id, language)
+        directory = self.directories.get(key, None)
+        if directory is None:
+            path = [str(contest_id) if contest_id else str()]
+            if language is not None:
+                path.append(self.get_language(language) if language else str())
+            directory = OPJ(self.root, *path)
+            with self.__lock:
+                self.directories[key] = directory
+        return directory
+
+    def get_path(self, submission_id: int, contest_id: int, language: str) -> Optional[str]:
+        if not any([contest_id, language, submission_id]):
+            return None
+        return OPJ(self.get_directory(contest_id, language), str(submission_id) if submission_id else str())
+
+    def ensure(self, contest_id: int, languages: Iterable[str] = ()) -> None:
+        directories = [self.get_directory(contest_id)]
+        directories += [self.get_directory(contest_id, language) for language in set(languages)]
+        for directory in directories:
+            if directory not in self.created:
+                os.makedirs(directory, exist_ok=True)
+                with self.__lock:
+                    self.created.add(directory)
+
+    def __listing(self, directory: str) -> Set[str]:
+        with self.__lock:
+            if directory not in self.listings:
+                try:
+                    with os.scandir(directory) as entries:
+                        self.listings[directory] = {entry.name for entry in entries}
+                except FileNotFoundError:
+                    self.listings[directory] = set()
+            return self.listings[directory]
+
+    def exists(self, path: str) -> bool:
+        self.__check_root()
+        directory, name = os.path.split(path)
+        return name in self.__listing(directory)
+
+    def add(self, path: str) -> None:
+        directory, name = os.path.split(path)
+        with self.__lock:
+            if directory in self.listings:
+                self.listings[directory].add(name)
+
+    def discard(self, path: str) -> None:
+        directory, name = os.path.split(path)
+        with self.__lock:
+            if directory in self.listings:
+                self.listings[directory].discard(name)
+
+    def remove(self, path: str) -> None:
+        ORM(path)
+        self.discard(path)
+
+    def rename(self, source: str, destination: str) -> None:
+        ORE(source, destination)
+        self.discard(source)
+        self.add(destination)
+
+    def invalidate(self, contest_id: Optional[int] = None) -> None:
+        with self.__lock:
+            if contest_id is None:
+                self.directories.clear()
+                self.listings.clear()
+                self.created.clear()
+                return
+            prefix = self.get_directory(contest_id)
+            for directory in [d for d in self.listings if d == prefix or d.startswith(prefix + os.sep)]:
+                self.listings.pop(directory)
+            self.created = {d for d in self.created if not (d == prefix or d.startswith(prefix + os.sep))}
+            for key in [k for k in self.directories if str(k[0]) == str(contest_id)]:
+                self.directories.pop(key)
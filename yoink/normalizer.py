@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import os
+import re
+import json
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, List, Dict, Tuple
+from yoink.utils import Config, OPE, OPJ, OPS, chunkenize, shorten_programming_language
+
+__c_like_literals = r'"(?:\\.|[^"\\\n])*"|\'(?:\\.|[^\'\\\n])*\''
+__c_like_comment_pattern = re.compile(r'(?P<comment>//[^\n]*|/\*.*?\*/)|' + __c_like_literals, re.DOTALL)
+__c_like_whitespace_pattern = re.compile(r'(?P<space>[ \t\f\v]+)|' + __c_like_literals)
+__python_comment_pattern = re.compile(
+    r'(?P<comment>#[^\n]*)|"""(?:\\.|.)*?"""|\'\'\'(?:\\.|.)*?\'\'\'|"(?:\\.|[^"\\\n])*"|\'(?:\\.|[^\'\\\n])*\'',
+    re.DOTALL)
+__token_pattern = re.compile(
+    r'"""(?:\\.|.)*?"""|\'\'\'(?:\\.|.)*?\'\'\'|"(?:\\.|[^"\\\n])*"|\'(?:\\.|[^\'\\\n])*\''
+    r'|0[xX][0-9a-fA-F]+|\d+(?:\.\d*)?(?:[eE][+-]?\d+)?[a-zA-Z]*|[A-Za-z_]\w*'
+    r'|<<=|>>=|\.\.\.|->|::|\+\+|--|<<|>>|<=|>=|==|!=|&&|\|\||\*\*|//|[-+*/%&|^]=|\S',
+    re.DOTALL)
+__tab_size = 4
+# Bump when the normalized form changes, cached entries are keyed by the raw source only.
+VERSION = 2
+
+
+def get_language(language: str) -> str:
+    return shorten_programming_language(language)
+
+
+def strip_comments(text: str, language: str) -> str:
+    pattern = __python_comment_pattern if get_language(language) == 'py' else __c_like_comment_pattern
+
+    def replace(match):
+        comment = match.group('comment')
+        if comment is None:
+            return match.group(0)
+        return '\n' * comment.count('\n') or ' '
+
+    return pattern.sub(replace, text)
+
+
+def normalize_whitespace(text: str, language: str) -> str:
+    text = text.replace('\\r\\n', '\n').replace('\r\n', '\n').replace('\r', '\n')
+    if get_language(language) == 'py':
+        # Only indentation is expanded, tabs inside literals are part of the program.
+        lines = []
+        for line in text.split('\n'):
+            indent = len(line) - len(line.lstrip(' \t'))
+            lines.append((line[:indent].expandtabs(__tab_size) + line[indent:]).rstrip())
+    else:
+        # Runs of blanks collapse outside string and char literals only.
+        text = __c_like_whitespace_pattern.sub(lambda m: m.group(0) if m.group('space') is None else ' ', text)
+        lines = [line.strip(' ') for line in text.split('\n')]
+    return '\n'.join(line for line in lines if line) + '\n'
+
+
+def normalize(text: str, language: str) -> str:
+    return normalize_whitespace(strip_comments(text, language), language)
+
+
+def tokenize(text: str) -> List[str]:
+    return __token_pattern.findall(text)
+
+
+def get_digest(data: bytes) -> str:
+    return hashlib.sha1(data).hexdigest()
+
+
+def normalize_files(args) -> List[Tuple[str, str]]:
+    paths, cache_path = args
+    result = []
+    for key, language, path in paths:
+        try:
+            with open(path, 'rb') as fp:
+                data = fp.read()
+        except OSError:
+            continue
+
+        digest = get_digest(data)
+        entry_path = OPJ(cache_path, digest[:2], f'{digest}.json')
+        if not OPE(entry_path):
+            source = normalize(data.decode('utf-8', errors='replace'), language)
+            os.makedirs(os.path.dirname(entry_path), exist_ok=True)
+            with open(entry_path, 'w', encoding='utf-8') as fp:
+                json.dump({'Language': language, 'Source': source, 'Tokens': tokenize(source)}, fp)
+        result.append((key, digest))
+    return result
+
+
+class Normalizer:
+    def __init__(self, *args, **kwargs):
+        self.manifests: Dict[str, dict] = {}
+
+    @property
+    def path(self) -> str:
+        return OPJ(Config()['Path-Prefix'], Config()['Normalize-Path'])
+
+    @property
+    def cache_path(self) -> str:
+        return OPJ(self.path, f'cache-v{VERSION}')
+
+    def get_manifest_path(self, contest_id) -> str:
+        return OPJ(self.path, f'{contest_id}.json')
+
+    def get_manifest(self, contest_id) -> dict:
+        contest_id = str(contest_id)
+        if contest_id not in self.manifests:
+            path = self.get_manifest_path(contest_id)
+            if OPE(path):
+                with open(path, 'r') as fp:
+                    self.manifests[contest_id] = json.load(fp)
+            else:
+                self.manifests[contest_id] = {}
+        return self.manifests[contest_id]
+
+    def get(self, contest_id, submission_id) -> Optional[dict]:
+        entry = self.get_manifest(contest_id).get(str(submission_id), None)
+        if not entry:
+            return None
+        digest = entry['Digest']
+        path = OPJ(self.cache_path, digest[:2], f'{digest}.json')
+        if not OPE(path):
+            return None
+        with open(path, 'r', encoding='utf-8') as fp:
+            return json.load(fp)
+
+    def __list_pending(self, contest_id) -> List[Tuple[str, str, str]]:
+        result = []
+        manifest = self.get_manifest(contest_id)
+        contest_path = Config().combine_path(contest_id)
+        if not OPE(contest_path):
+            return result
+        for language_dir in os.scandir(contest_path):
+            if not language_dir.is_dir():
+                continue
+            for entry in os.scandir(language_dir.path):
+                name, extension = OPS(entry.name)
+                if not entry.is_file() or extension == '.json':
+                    continue
+                stat = entry.stat()
+                known = manifest.get(name, None)
+                if known and known['Size'] == stat.st_size and known['Modified'] == stat.st_mtime:
+                    continue
+                manifest[name] = {'Size': stat.st_size, 'Modified': stat.st_mtime, 'Digest': None}
+                result.append((f'{contest_id}/{name}', language_dir.name, entry.path))
+        return result
+
+    def run(self, contest_ids: Optional[list] = None) -> int:
+        if contest_ids is None:
+            contest_ids = [d for d in os.listdir(Config().working_dir_path) if d.isdigit()]
+
+        pending = {contest_id: self.__list_pending(contest_id) for contest_id in contest_ids}
+        paths = [path for contest_paths in pending.values() for path in contest_paths]
+        if paths:
+            workers = Config()['Normalize-Workers'] if Config()['Normalize-Workers'] > 0 else os.cpu_count()
+            chunks = [(chunk, self.cache_path) for chunk in chunkenize(paths, 256)]
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                for normalized in executor.map(normalize_files, chunks):
+                    for key, digest in normalized:
+                        contest_id, name = key.split('/')
+                        self.get_manifest(contest_id)[name]['Digest'] = digest
+
+        os.makedirs(self.path, exist_ok=True)
+        for contest_id in filter(lambda x: pending[x], pending):
+            manifest = self.get_manifest(contest_id)
+            manifest = {k: v for k, v in manifest.items() if v['Digest']}
+            self.manifests[str(contest_id)] = manifest
+            with open(self.get_manifest_path(contest_id), 'w') as fp:
+                json.dump(manifest, fp)
+        return len(paths)
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import os
+import json
+import math
+from collections import Counter
+from yoink.cache import ResponseCache
+from yoink.events import EventBus
+from yoink.utils import Singleton, Config, OPE, OPJ
+
+
+class Pager(metaclass=Singleton):
+    __fields = ['Requests', 'Rows', 'Bytes', 'Eligible', 'Ingested']
+
+    def __init__(self):
+        self.totals = Counter()
+        self.contests = {}
+
+    def observed(self, contest_id: int) -> Counter:
+        if contest_id not in self.contests:
+            self.contests[contest_id] = Counter()
+        return self.contests[contest_id]
+
+    @property
+    def prior(self) -> float:
+        if self.totals['Rows'] == 0:
+            return 0.0
+        return self.totals['Eligible'] / self.totals['Rows']
+
+    def ratio(self, contest_id: int) -> float:
+        # Pages seen in this contest weigh in against what earlier contests looked like.
+        observed = self.observed(contest_id)
+        weight = Config()['Page-Prior-Weight'] if self.totals['Rows'] > observed['Rows'] else 0
+        rows = observed['Rows'] + weight
+        if rows == 0:
+            return 0.0
+        return (observed['Eligible'] + weight * self.prior) / rows
+
+    @staticmethod
+    def get_plan_path(contest_id: int) -> str:
+        return OPJ(ResponseCache().path, 'pages', f'{contest_id}.json')
+
+    @staticmethod
+    def __load_plan(contest_id: int) -> dict:
+        path = Pager.get_plan_path(contest_id)
+        if not OPE(path):
+            return {}
+        with open(path, 'r') as fp:
+            return json.load(fp)
+
+    def remember(self, contest_id: int, start: int, count: int) -> None:
+        # Cached pages are keyed by their size, a replay has to ask for the same sizes again.
+        if not ResponseCache().enabled or Config()['Reprocess-From-Cache']:
+            return
+        plan = Pager.__load_plan(contest_id)
+        if plan.get(str(start), None) == count:
+            return
+        plan[str(start)] = count
+        path = Pager.get_plan_path(contest_id)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as fp:
+            json.dump(plan, fp)
+
+    def page_size(self, contest_id: int, need: int, start: int = 1) -> int:
+        maximum = Config()['Page-Size']
+        if Config()['Reprocess-From-Cache']:
+            return Pager.__load_plan(contest_id).get(str(start), maximum)
+        if not Config()['Adaptive-Paging'] or need < 0:
+            return maximum
+        ratio = self.ratio(contest_id)
+        if ratio <= 0:
+            return maximum
+        count = math.ceil(need / ratio * Config()['Page-Safety-Margin'])
+        return max(min(count, maximum), min(Config()['Min-Page-Size'], maximum))
+
+    def record(self, contest_id: int, **kwargs) -> None:
+        observed = self.observed(contest_id)
+        for field in Pager.__fields:
+            observed[field] += kwargs.get(field.lower(), 0)
+            self.totals[field] += kwargs.get(field.lower(), 0)
+
+    def report(self, contest_id: int = None) -> None:
+        counts = self.totals if contest_id is None else self.observed(contest_id)
+        EventBus().emit('paging', Contest=contest_id, **{field: counts[field] for field in Pager.__fields})
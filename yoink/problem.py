@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+from typing import Optional
+from yoink.utils import Config
+
+
+class Problem:
+    @staticmethod
+    def serialize(**kwargs) -> Optional[dict]:
+        instance = kwargs.get('instance', None)
+        if not instance:
+            return None
+
+        return \
+            {
+                'Contest-Id': instance.contest_id,
+                'Index': instance.index,
+                'Name': instance.name,
+                'Rating': instance.rating,
+                'Tags': instance.tags,
+            }
+
+    @staticmethod
+    def deserialize(**kwargs) -> Optional[Problem]:
+        data = kwargs.get('data', None)
+        if not data:
+            return None
+
+        return Problem(contest_id=data['Contest-Id'],
+                       info={
+                           'index': data['Index'],
+                           'name': data.get('Name', str()),
+                           'rating': data.get('Rating', None),
+                           'tags': data.get('Tags', []),
+                       })
+
+    @staticmethod
+    def get_key(contest_id: int, index: str) -> str:
+        return f'{contest_id}{index}'
+
+    @staticmethod
+    def get_submission_key(contest_id: int, index: str, submission_id: int) -> str:
+        # Submissions saved without an index cannot share a problem, each keeps its own tags.
+        if not index:
+            return f'{contest_id}/{submission_id}'
+        return Problem.get_key(contest_id, index)
+
+    def __init__(self, *args, **kwargs):
+        self.contest_id = kwargs.get('contest_id', int())
+        self.index = str()
+        self.name = str()
+        self.rating = None
+        self.tags = list()
+        if kwargs.get('info', None):
+            self.__sync(kwargs['info'])
+
+    def __sync(self, info) -> None:
+        self.contest_id = info.get('contestId', self.contest_id)
+        self.index = info.get('index', str())
+        self.name = info.get('name', str())
+        self.rating = info.get('rating', None)
+        self.tags = [tag for tag in info.get('tags', [])]
+
+    @property
+    def key(self) -> str:
+        return Problem.get_key(self.contest_id, self.index)
+
+    def is_excluded(self) -> bool:
+        return any(map(lambda tag: tag in Config()['Excluded-Tags'], self.tags))
@@ -0,0 +1,222 @@
+from __future__ import annotations
+
+import os
+import mmap
+import random
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, List, Iterator, Iterable
+from yoink import codec, enums
+from yoink.contest import Contest
+from yoink.problem import Problem
+from yoink.submission import Submission
+from yoink.utils import Config, OPE, OPJ, shorten_programming_language
+
+
+class DatasetView:
+    def __init__(self, reader: DatasetReader, indices: List[int]):
+        self.reader = reader
+        self.indices = indices
+
+    def __len__(self) -> int:
+        return len(self.indices)
+
+    def __getitem__(self, item: int) -> dict:
+        return self.reader.get(self.indices[item])
+
+    def __iter__(self) -> Iterator[dict]:
+        for index in self.indices:
+            yield self.reader.get(index)
+
+    def filter(self, **kwargs) -> DatasetView:
+        return DatasetView(self.reader, self.reader.select(self.indices, **kwargs))
+
+    def batches(self, batch_size: int, **kwargs) -> Iterator[List[dict]]:
+        indices = list(self.indices)
+        if kwargs.get('shuffle', True):
+            random.Random(kwargs.get('seed', None)).shuffle(indices)
+        chunks = [indices[i:i + batch_size] for i in range(0, len(indices), batch_size)]
+        if kwargs.get('drop_last', False) and chunks and len(chunks[-1]) < batch_size:
+            chunks.pop()
+
+        prefetch = max(kwargs.get('prefetch', 2), 1)
+        with ThreadPoolExecutor(max_workers=kwargs.get('workers', prefetch)) as executor:
+            pending = deque()
+            chunks = iter(chunks)
+            for chunk in chunks:
+                pending.append(executor.submit(lambda c: [self.reader.get(i) for i in c], chunk))
+                if len(pending) >= prefetch:
+                    break
+            while pending:
+                batch = pending.popleft().result()
+                chunk = next(chunks, None)
+                if chunk:
+                    pending.append(executor.submit(lambda c: [self.reader.get(i) for i in c], chunk))
+                yield batch
+
+
+class DatasetReader(DatasetView):
+    def __init__(self, *args, **kwargs):
+        self.path = kwargs.get('path', None) or OPJ(Config()['Path-Prefix'], Config()['Reader-Path'])
+        self.columns = {
+            'Contest-Id': [],
+            'Id': [],
+            'Language': [],
+            'Verdict': [],
+            'Problem': [],
+            'Offset': [],
+            'Length': [],
+            'Modified': [],
+        }
+        self.languages = []
+        self.verdicts = []
+        self.problems = []
+        self.tags = {}
+        self.__data = None
+        if kwargs.get('build', False):
+            self.build()
+        else:
+            self.load()
+        super().__init__(self, list(range(len(self.columns['Id']))))
+
+    @property
+    def index_path(self) -> str:
+        return OPJ(self.path, f'index.{codec.get_codec().extension}')
+
+    @property
+    def data_path(self) -> str:
+        return OPJ(self.path, 'sources.bin')
+
+    def load(self) -> None:
+        found = codec.find(OPJ(self.path, 'index'))
+        if not found:
+            return
+        data = codec.load(*found)
+        self.columns = data['Columns']
+        # Indexes built before modification times were kept get every source checked once.
+        self.columns.setdefault('Modified', [0] * len(self.columns['Id']))
+        self.languages = data['Languages']
+        self.verdicts = data['Verdicts']
+        self.problems = data['Problems']
+        self.tags = {key: tags for key, tags in data['Tags'].items()}
+        self.__open()
+
+    def __open(self) -> None:
+        self.__data = None
+        if OPE(self.data_path) and os.path.getsize(self.data_path) > 0:
+            with open(self.data_path, 'rb') as fp:
+                self.__data = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def build(self, contest_ids: Optional[Iterable] = None) -> int:
+        self.load()
+        if contest_ids is None:
+            contest_ids = sorted(int(d) for d in os.listdir(Config().working_dir_path) if d.isdigit())
+
+        indexed = {uid: i for i, uid in enumerate(zip(self.columns['Contest-Id'], self.columns['Id']))}
+        language_codes = {v: i for i, v in enumerate(self.languages)}
+        verdict_codes = {v: i for i, v in enumerate(self.verdicts)}
+        problem_codes = {v: i for i, v in enumerate(self.problems)}
+        added = 0
+
+        os.makedirs(self.path, exist_ok=True)
+        if self.__data:
+            self.__data.close()
+            self.__data = None
+        with open(self.data_path, 'ab') as fp:
+            offset = fp.tell()
+            for contest_id in contest_ids:
+                contest = Contest.deserialize(path=Contest.get_path(contest_id, meta=True))
+                if not contest:
+                    continue
+                for submission in contest.submissions.values():
+                    if submission.download_status != enums.DownloadStatus.FINISHED.value:
+                        continue
+                    path = Submission.get_dumped_code_path(submission.id, contest.id, submission.language)
+                    if not path or not OPE(path):
+                        continue
+                    # A rewritten source is appended again and its row pointed at the new bytes.
+                    stat = os.stat(path)
+                    row = indexed.get((contest.id, submission.id), None)
+                    if row is not None and self.columns['Length'][row] == stat.st_size and \
+                            self.columns['Modified'][row] == stat.st_mtime:
+                        continue
+                    with open(path, 'rb') as source:
+                        data = source.read()
+                    fp.write(data)
+
+                    problem = Problem.get_submission_key(contest.id, submission.problem_index, submission.id)
+                    if problem not in problem_codes:
+                        problem_codes[problem] = len(self.problems)
+                        self.problems.append(problem)
+                    self.tags[problem] = submission.tags
+                    if submission.language not in language_codes:
+                        language_codes[submission.language] = len(self.languages)
+                        self.languages.append(submission.language)
+                    if submission.verdict not in verdict_codes:
+                        verdict_codes[submission.verdict] = len(self.verdicts)
+                        self.verdicts.append(submission.verdict)
+
+                    values = {
+                        'Contest-Id': contest.id,
+                        'Id': submission.id,
+                        'Language': language_codes[submission.language],
+                        'Verdict': verdict_codes[submission.verdict],
+                        'Problem': problem_codes[problem],
+                        'Offset': offset,
+                        'Length': len(data),
+                        'Modified': stat.st_mtime,
+                    }
+                    if row is None:
+                        indexed[(contest.id, submission.id)] = len(self.columns['Id'])
+                    for name, value in values.items():
+                        if row is None:
+                            self.columns[name].append(value)
+                        else:
+                            self.columns[name][row] = value
+                    offset += len(data)
+                    added += 1
+
+        codec.dump({
+            'Schema-Version': codec.SCHEMA_VERSION,
+            'Columns': self.columns,
+            'Languages': self.languages,
+            'Verdicts': self.verdicts,
+            'Problems': self.problems,
+            'Tags': self.tags,
+        }, self.index_path)
+        self.__open()
+        self.indices = list(range(len(self.columns['Id'])))
+        return added
+
+    def get(self, index: int) -> dict:
+        offset = self.columns['Offset'][index]
+        length = self.columns['Length'][index]
+        problem = self.problems[self.columns['Problem'][index]]
+        return {
+            'Contest-Id': self.columns['Contest-Id'][index],
+            'Id': self.columns['Id'][index],
+            'Language': self.languages[self.columns['Language'][index]],
+            'Verdict': self.verdicts[self.columns['Verdict'][index]],
+            'Problem': problem,
+            'Tags': self.tags.get(problem, []),
+            'Source': self.__data[offset:offset + length].decode('utf-8', errors='replace') if length else str(),
+        }
+
+    def select(self, indices: List[int], **kwargs) -> List[int]:
+        languages = kwargs.get('languages', None)
+        tags = kwargs.get('tags', None)
+        verdicts = kwargs.get('verdicts', None)
+
+        language_codes = None
+        if languages is not None:
+            short = set(map(shorten_programming_language, languages))
+            language_codes = {i for i, v in enumerate(self.languages)
+                              if v in languages or shorten_programming_language(v) in short}
+        verdict_codes = None if verdicts is None else {i for i, v in enumerate(self.verdicts) if v in verdicts}
+        problem_codes = None if tags is None else \
+            {i for i, p in enumerate(self.problems) if any(tag in tags for tag in self.tags.get(p, []))}
+
+        return [i for i in indices
+                if (language_codes is None or self.columns['Language'][i] in language_codes)
+                and (verdict_codes is None or self.columns['Verdict'][i] in verdict_codes)
+                and (problem_codes is None or self.columns['Problem'][i] in problem_codes)]
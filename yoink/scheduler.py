@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+from collections import Counter, OrderedDict, deque
+from typing import List, Tuple, Union
+from yoink import enums
+from yoink.events import EventBus
+from yoink.problem import Problem
+from yoink.utils import Singleton, Config
+
+
+class Scheduler(metaclass=Singleton):
+    __criteria = ['Problem', 'Language', 'Tag']
+
+    def __init__(self):
+        self.registered = {}
+        self.problems = {}
+        self.counts = {criterion: Counter() for criterion in Scheduler.__criteria}
+        self.spent = {criterion: Counter() for criterion in Scheduler.__criteria}
+        self.outcomes = Counter()
+        self.skipped = Counter()
+
+    @staticmethod
+    def get_keys(submission) -> dict:
+        return {
+            'Problem': [Problem.get_key(submission.contest_id, submission.problem_index)],
+            'Language': [submission.language],
+            'Tag': list(submission.tags),
+        }
+
+    @staticmethod
+    def __quota(criterion: str, key: str) -> int:
+        quota: Union[int, dict] = Config()[f'{criterion}-Quota']
+        if isinstance(quota, dict):
+            return quota.get(key, quota.get('*', -1))
+        return quota
+
+    @property
+    def priority(self) -> List[str]:
+        priority = [c for c in Config()['Schedule-Priority'] if c in Scheduler.__criteria]
+        return priority + [c for c in Scheduler.__criteria if c not in priority]
+
+    def register(self, submission) -> None:
+        registered = self.registered.setdefault(submission.contest_id, set())
+        if submission.id in registered:
+            return
+        registered.add(submission.id)
+        self.__track(submission)
+        for criterion, keys in Scheduler.get_keys(submission).items():
+            for key in keys:
+                self.counts[criterion][key] += 1
+
+    def __is_full(self, keys: dict, counts: dict) -> Tuple[bool, str]:
+        for criterion in self.priority:
+            for key in keys[criterion]:
+                quota = Scheduler.__quota(criterion, key)
+                if 0 <= quota <= counts[criterion][key]:
+                    return True, criterion
+        return False, str()
+
+    def __rank(self, keys: dict, counts: dict) -> tuple:
+        rank = []
+        for criterion in self.priority:
+            values = [counts[criterion][key] for key in keys[criterion]]
+            rank.append(min(values) if values else 0)
+        return tuple(rank)
+
+    def schedule(self, submissions: list, budget: int = -1) -> list:
+        buckets = OrderedDict()
+        for submission in submissions:
+            keys = Scheduler.get_keys(submission)
+            bucket = (keys['Problem'][0], submission.language)
+            if bucket not in buckets:
+                buckets[bucket] = (keys, deque())
+            buckets[bucket][1].append(submission)
+
+        counts = {criterion: Counter(self.counts[criterion]) for criterion in Scheduler.__criteria}
+        result = []
+        while buckets and (budget < 0 or len(result) < budget):
+            best, best_rank = None, None
+            for bucket, (keys, _) in list(buckets.items()):
+                full, criterion = self.__is_full(keys, counts)
+                if full:
+                    self.skipped[criterion] += len(buckets.pop(bucket)[1])
+                    continue
+                rank = self.__rank(keys, counts)
+                if best_rank is None or rank < best_rank:
+                    best, best_rank = bucket, rank
+            if best is None:
+                break
+
+            keys, pending = buckets[best]
+            result.append(pending.popleft())
+            if not pending:
+                buckets.pop(best)
+            for criterion in Scheduler.__criteria:
+                for key in keys[criterion]:
+                    counts[criterion][key] += 1
+
+        return result
+
+    def __track(self, submission) -> None:
+        self.problems.setdefault(submission.contest_id, set()).add(
+            Problem.get_key(submission.contest_id, submission.problem_index))
+
+    def finish(self, contest_id: int) -> None:
+        # Problems belong to one contest, only language and tag counts are needed after it is done.
+        self.registered.pop(contest_id, None)
+        for key in self.problems.pop(contest_id, set()):
+            self.counts['Problem'].pop(key, None)
+            self.spent['Problem'].pop(key, None)
+
+    def record(self, submission, status: str) -> None:
+        self.outcomes[status] += 1
+        self.__track(submission)
+        for criterion, keys in Scheduler.get_keys(submission).items():
+            for key in keys:
+                self.spent[criterion][key] += 1
+        if status == enums.DownloadStatus.FINISHED.value:
+            self.register(submission)
+
+    def report(self, title: str = 'Request budget') -> None:
+        EventBus().emit('schedule',
+                        Title=title,
+                        Requests=sum(self.outcomes.values()),
+                        Outcomes=dict(self.outcomes.most_common()),
+                        Spent={criterion: dict(self.spent[criterion].most_common()) for criterion in self.priority},
+                        Skipped=dict(self.skipped.most_common()))
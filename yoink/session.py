@@ -0,0 +1,87 @@
+import os
+import re
+import json
+import requests
+import threading
+from typing import Optional
+from yoink.aes import decrypt_cbc
+from yoink.utils import Singleton, Config, OPE, OPJ
+
+__challenge_pattern = re.compile(r'(\w+)\s*=\s*toNumbers\(\s*"([0-9a-fA-F]+)"\s*\)')
+__cookie_pattern = re.compile(r'document\.cookie\s*=\s*"(\w+)="')
+__href_pattern = re.compile(r'document\.location\.href\s*=\s*"(.*?)"')
+
+
+def is_redirecting(response: requests.Response) -> bool:
+    try:
+        text = response.text
+    except (AttributeError, TypeError):
+        return False
+    return 'redirecting' in text.lower() and __href_pattern.search(text) is not None
+
+
+def solve_challenge(text: str) -> Optional[tuple]:
+    numbers = {name: bytes.fromhex(value) for name, value in __challenge_pattern.findall(text)}
+    cookie = __cookie_pattern.search(text)
+    if not cookie or not all(key in numbers for key in 'abc'):
+        return None
+
+    value = decrypt_cbc(numbers['c'], numbers['a'], numbers['b']).hex()
+    href = __href_pattern.search(text)
+    return cookie.group(1), value, href.group(1) if href else None
+
+
+class Session(metaclass=Singleton):
+    def __init__(self):
+        self.session = requests.Session()
+        self.solved = 0
+        self.__lock = threading.Lock()
+        self.__load()
+
+        cookie = Config()['GET-Headers'].get('Cookie', str())
+        for pair in filter(None, map(str.strip, cookie.split(';'))):
+            name, _, value = pair.partition('=')
+            self.session.cookies.set(name, value, domain='codeforces.com', path='/')
+
+    @property
+    def path(self) -> str:
+        return OPJ(Config()['Path-Prefix'], Config()['Cookie-Path'])
+
+    def __load(self) -> None:
+        if not OPE(self.path):
+            return
+        try:
+            with open(self.path, 'r') as fp:
+                cookies = json.load(fp)
+        except (OSError, ValueError):
+            return
+        for cookie in cookies:
+            self.session.cookies.set(cookie['Name'], cookie['Value'],
+                                     domain=cookie['Domain'], path=cookie['Path'])
+
+    def save(self) -> None:
+        cookies = [{'Name': c.name, 'Value': c.value, 'Domain': c.domain, 'Path': c.path}
+                   for c in self.session.cookies]
+        temp_path = f'{self.path}.{os.getpid()}.tmp'
+        with open(temp_path, 'w') as fp:
+            json.dump(cookies, fp, indent=4)
+        os.replace(temp_path, self.path)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        headers = kwargs.pop('headers', None)
+        if headers:
+            # Cookies live in the jar, an explicit header would shadow it.
+            headers = {k: v for k, v in headers.items() if k.lower() != 'cookie'}
+        return self.session.get(url, headers=headers, **kwargs)
+
+    def solve(self, response: requests.Response) -> Optional[str]:
+        solution = solve_challenge(response.text)
+        if not solution:
+            return None
+
+        name, value, href = solution
+        with self.__lock:
+            self.session.cookies.set(name, value, domain='codeforces.com', path='/')
+            self.solved += 1
+            self.save()
+        return href
@@ -0,0 +1,241 @@
+from __future__ import annotations
+
+import os
+import json
+import argparse
+import numpy as np
+from typing import Optional, Dict, List, Tuple
+from yoink import codec
+from yoink.contest import Contest
+from yoink.problem import Problem
+from yoink.utils import Config, OPE, OPJ
+
+# Bump when the way rows are derived changes, so existing column files are rebuilt.
+VERSION = 2
+__columns = {
+    'Contest-Id': np.int32,
+    'Id': np.int64,
+    'Language': np.int16,
+    'Verdict': np.int16,
+    'Download-Status': np.int8,
+    'Problem': np.int32,
+    'Time': np.int32,
+    'Memory': np.int64,
+}
+__groups = {
+    'Language': 'Languages',
+    'Verdict': 'Verdicts',
+    'Download-Status': 'Download-Statuses',
+    'Problem': 'Problems',
+}
+
+
+def get_columns() -> Dict[str, type]:
+    return dict(__columns)
+
+
+def get_group_table(by: str) -> Optional[str]:
+    return __groups.get(by, None)
+
+
+def get_group_tables() -> List[str]:
+    return list(__groups.values())
+
+
+def get_group_columns() -> List[str]:
+    return list(__groups.keys())
+
+
+class CorpusStats:
+    def __init__(self, *args, **kwargs):
+        self.path = kwargs.get('path', None) or OPJ(Config()['Path-Prefix'], Config()['Stats-Path'])
+        self.columns: Dict[str, np.ndarray] = {name: np.empty(0, dtype) for name, dtype in get_columns().items()}
+        self.tables = {'Languages': [], 'Verdicts': [], 'Download-Statuses': [], 'Problems': [], 'Tags': {}}
+        self.modified: Dict[str, float] = {}
+        self.load()
+        if kwargs.get('refresh', True):
+            self.refresh()
+
+    def __len__(self) -> int:
+        return len(self.columns['Id'])
+
+    @property
+    def tables_path(self) -> str:
+        return OPJ(self.path, 'tables.json')
+
+    def get_column_path(self, name: str) -> str:
+        return OPJ(self.path, f'{name}.npy')
+
+    def load(self) -> None:
+        if not OPE(self.tables_path):
+            return
+        with open(self.tables_path, 'r') as fp:
+            data = json.load(fp)
+        if data.get('Schema-Version') != codec.SCHEMA_VERSION or data.get('Version') != VERSION:
+            return
+        for name in get_columns():
+            if not OPE(self.get_column_path(name)):
+                return
+        self.tables = data['Tables']
+        self.modified = data['Modified']
+        self.columns = {name: np.load(self.get_column_path(name), mmap_mode='r') for name in get_columns()}
+
+    def __code(self, table: str, value, codes: dict) -> int:
+        if value not in codes:
+            codes[value] = len(self.tables[table])
+            self.tables[table].append(value)
+        return codes[value]
+
+    def refresh(self, contest_ids: Optional[list] = None) -> int:
+        if contest_ids is None:
+            contest_ids = [d for d in os.listdir(Config().working_dir_path) if d.isdigit()]
+
+        changed = {}
+        for contest_id in map(str, contest_ids):
+            found = codec.find(os.path.splitext(Contest.get_path(contest_id, meta=True))[0])
+            if not found:
+                continue
+            modified = os.path.getmtime(found[0])
+            if self.modified.get(contest_id, None) != modified:
+                changed[contest_id] = (found, modified)
+        if not changed:
+            return 0
+
+        codes = {table: {v: i for i, v in enumerate(self.tables[table])} for table in get_group_tables()}
+        rows = {name: [] for name in get_columns()}
+        for contest_id, ((path, contest_codec), modified) in changed.items():
+            data = codec.upgrade(codec.load(path, contest_codec))
+            for serialized_problem in data.get('Problems', {}).values():
+                key = Problem.get_key(serialized_problem['Contest-Id'], serialized_problem['Index'])
+                self.tables['Tags'][key] = serialized_problem.get('Tags', [])
+                self.__code('Problems', key, codes['Problems'])
+            for s in data['Submissions'].values():
+                problem = Problem.get_submission_key(s['Contest-Id'], s.get('Problem-Index', str()), s['Id'])
+                if problem not in self.tables['Tags']:
+                    self.tables['Tags'][problem] = s.get('Tags', [])
+                rows['Contest-Id'].append(s['Contest-Id'])
+                rows['Id'].append(s['Id'])
+                rows['Language'].append(self.__code('Languages', s['Language'], codes['Languages']))
+                rows['Verdict'].append(self.__code('Verdicts', s['Verdict'], codes['Verdicts']))
+                rows['Download-Status'].append(
+                    self.__code('Download-Statuses', s['Download-Status'], codes['Download-Statuses']))
+                rows['Problem'].append(self.__code('Problems', problem, codes['Problems']))
+                rows['Time'].append(s['Time-Consumed'])
+                rows['Memory'].append(s['Memory-Consumed'])
+            self.modified[contest_id] = modified
+
+        keep = ~np.isin(self.columns['Contest-Id'], np.array([int(c) for c in changed], dtype=np.int32))
+        self.columns = {name: np.concatenate([np.asarray(self.columns[name])[keep], np.array(rows[name], dtype)])
+                        for name, dtype in get_columns().items()}
+        self.__dump()
+        return len(rows['Id'])
+
+    def __dump(self) -> None:
+        os.makedirs(self.path, exist_ok=True)
+        for name, column in self.columns.items():
+            np.save(self.get_column_path(name), column)
+        with open(self.tables_path, 'w') as fp:
+            json.dump({'Schema-Version': codec.SCHEMA_VERSION, 'Version': VERSION, 'Tables': self.tables, 'Modified': self.modified}, fp)
+        self.columns = {name: np.load(self.get_column_path(name), mmap_mode='r') for name in get_columns()}
+
+    def mask(self, **kwargs) -> np.ndarray:
+        result = np.ones(len(self), dtype=bool)
+        for by, values in kwargs.items():
+            if values is None:
+                continue
+            if by == 'Tag':
+                codes = [i for i, key in enumerate(self.tables['Problems'])
+                         if any(tag in values for tag in self.tables['Tags'].get(key, []))]
+                result &= np.isin(self.columns['Problem'], codes)
+                continue
+            if not get_group_table(by):
+                raise ValueError(f'Cannot filter by {by}, expected Tag or one of {", ".join(get_group_columns())}')
+            table = self.tables[get_group_table(by)]
+            result &= np.isin(self.columns[by], [i for i, v in enumerate(table) if v in values])
+        return result
+
+    def __select(self, by: str, mask: np.ndarray) -> Tuple[np.ndarray, np.ndarray, List[str]]:
+        rows = np.flatnonzero(mask)
+        if by != 'Tag':
+            return rows, np.asarray(self.columns[by])[rows], self.tables[get_group_table(by)]
+
+        # A submission counts once for every tag of its problem.
+        tags = sorted({tag for problem_tags in self.tables['Tags'].values() for tag in problem_tags})
+        tag_codes = {tag: i for i, tag in enumerate(tags)}
+        pairs = [(p, tag_codes[tag]) for p, key in enumerate(self.tables['Problems'])
+                 for tag in self.tables['Tags'].get(key, [])]
+        if not pairs or not len(rows):
+            return np.empty(0, np.int64), np.empty(0, np.int64), tags
+        pair_problems, pair_tags = np.array(pairs, dtype=np.int64).T
+
+        problems = np.asarray(self.columns['Problem'])[rows]
+        order = np.argsort(problems, kind='stable')
+        starts = np.searchsorted(problems[order], pair_problems, side='left')
+        ends = np.searchsorted(problems[order], pair_problems, side='right')
+        lengths = ends - starts
+        offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+        return rows[order[offsets]], np.repeat(pair_tags, lengths), tags
+
+    def count(self, by: str, **kwargs) -> Dict[str, int]:
+        _, groups, names = self.__select(by, self.mask(**kwargs))
+        counts = np.bincount(groups, minlength=len(names))
+        return {names[i]: int(c) for i in np.argsort(-counts, kind='stable') if (c := counts[i]) > 0}
+
+    def aggregate(self, column: str, by: str, **kwargs) -> Dict[str, dict]:
+        q = kwargs.pop('percentiles', [50, 90, 99])
+        rows, groups, names = self.__select(by, self.mask(**kwargs))
+        values = np.asarray(self.columns[column])[rows].astype(np.float64)
+        order = np.lexsort((values, groups))
+        values, groups = values[order], groups[order]
+        counts = np.bincount(groups, minlength=len(names))
+        starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+        sums = np.bincount(groups, weights=values, minlength=len(names))
+        squares = np.bincount(groups, weights=values ** 2, minlength=len(names))
+
+        present = np.flatnonzero(counts)
+        means = sums[present] / counts[present]
+        result = {}
+        quantiles = {}
+        for p in q:
+            position = starts[present] + p / 100 * (counts[present] - 1)
+            lower = np.floor(position).astype(np.int64)
+            upper = np.ceil(position).astype(np.int64)
+            quantiles[p] = values[lower] + (values[upper] - values[lower]) * (position - lower)
+        for j, i in enumerate(present):
+            result[names[i]] = {
+                'Count': int(counts[i]),
+                'Mean': float(means[j]),
+                'Std': float(np.sqrt(max(squares[i] / counts[i] - means[j] ** 2, 0.0))),
+                'Min': float(values[starts[i]]),
+                'Max': float(values[starts[i] + counts[i] - 1]),
+                **{f'P{p}': float(quantiles[p][j]) for p in q},
+            }
+        return result
+
+    def histogram(self, column: str, bins=50, **kwargs) -> Tuple[np.ndarray, np.ndarray]:
+        values = np.asarray(self.columns[column])[self.mask(**kwargs)]
+        return np.histogram(values, bins=bins)
+
+    def report(self, **kwargs) -> dict:
+        return {
+            'Submissions': int(self.mask(**kwargs).sum()),
+            'Counts': {by: self.count(by, **kwargs) for by in ['Language', 'Verdict', 'Tag', 'Download-Status']},
+            'Time': self.aggregate('Time', 'Language', **kwargs),
+            'Memory': self.aggregate('Memory', 'Language', **kwargs),
+        }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Corpus statistics over submission metadata.')
+    parser.add_argument('--language', nargs='*', default=None)
+    parser.add_argument('--verdict', nargs='*', default=None)
+    parser.add_argument('--status', nargs='*', default=None)
+    parser.add_argument('--tag', nargs='*', default=None)
+    parser.add_argument('--no-refresh', action='store_true')
+    arguments = parser.parse_args()
+
+    stats = CorpusStats(refresh=not arguments.no_refresh)
+    print(json.dumps(stats.report(**{'Language': arguments.language,
+                                     'Verdict': arguments.verdict,
+                                     'Download-Status': arguments.status,
+                                     'Tag': arguments.tag}), indent=4))
@@ -1,12 +1,14 @@
 from __future__ import annotations
 
 import json
-import time
-import requests
 import yoink.enums as enums
 from typing import Optional
-from yoink.utils import Config, OPE, OMD, ORE, OPS, ORM, shorten_programming_language
-from yoink.utils import reset_timeout_counter, check_for_redirecting, check_for_status, get_html_content
+from yoink.cache import ResponseCache, request
+from yoink.layout import Layout
+from yoink.problem import Problem
+from yoink.utils import Config, OPE, OPS
+from yoink.session import is_redirecting
+from yoink.utils import reset_timeout_counter, issue_timeout, check_for_status, get_html_content
 
 
 class Submission:
@@ -17,12 +19,12 @@ class Submission:
             return None
 
         # TODO: don't serialize empty fields.
-        return \
+        result = \
             {
                 'Id': instance.id,
                 'Download-Status': instance.download_status,
                 'Contest-Id': instance.contest_id,
-                'Tags': instance.tags,
+                'Problem-Index': instance.problem_index,
                 'Language': instance.language,
                 'Verdict': instance.verdict,
                 'Authors': instance.handles,
@@ -30,37 +32,45 @@ class Submission:
                 'Memory-Consumed': instance.memory_consumed_bytes
             }
 
+        # Submissions saved before problems were stored per contest only know their tags.
+        if not instance.problem_index:
+            result['Tags'] = instance.tags
+        return result
+
     @staticmethod
     def deserialize(**kwargs) -> Optional[Submission]:
         string = kwargs.get('string', None)
         path = kwargs.get('path', None)
-        if string:
+        data = kwargs.get('data', None)
+        if data is None and string:
             data = json.loads(string)
-        elif path and OPE(path):
+        elif data is None and path and OPE(path):
             with open(path, 'r') as fp:
                 data = json.load(fp)
-        else:
+        if data is None:
             return None
 
+        problem_index = data.get('Problem-Index', str())
+        problem = kwargs.get('problems', {}).get(Problem.get_key(data['Contest-Id'], problem_index), None)
+        if not problem_index or not problem:
+            problem = Problem(contest_id=data['Contest-Id'],
+                              info={'index': problem_index, 'tags': data.get('Tags', [])})
+
         # TODO: check if key is present before accessing it.
-        return Submission(contest_id=data['Contest-Id'],
-                          download_status=data['Download-Status'],
-                          info={
-                              'id': data['Id'],
-                              'problem': {'tags': data['Tags']},
-                              'programmingLanguage': data['Language'],
-                              'verdict': data['Verdict'],
-                              'author': {'members': [{'handle': h for h in data['Authors']}]},
-                              'timeConsumedMillis': data['Time-Consumed'],
-                              'memoryConsumedBytes': data['Memory-Consumed']
-                          })
+        instance = Submission(contest_id=data['Contest-Id'],
+                              download_status=data['Download-Status'],
+                              problem=problem)
+        instance.id = data['Id']
+        instance.language = data['Language']
+        instance.verdict = data['Verdict']
+        instance.handles = data['Authors']
+        instance.time_consumed_millis = data['Time-Consumed']
+        instance.memory_consumed_bytes = data['Memory-Consumed']
+        return instance
 
     @staticmethod
     def get_code_path_extensionless(submission_id: int, contest_id: int, language: str) -> Optional[str]:
-        path = [contest_id, shorten_programming_language(language), submission_id]
-        if not any(path):
-            return None
-        return Config().combine_path(*path)
+        return Layout().get_path(submission_id, contest_id, language)
 
     @staticmethod
     def get_dumped_code_meta_path(submission_id: int, contest_id: int, language: str) -> Optional[str]:
@@ -74,7 +84,7 @@ class Submission:
         path = Submission.get_code_path_extensionless(submission_id, contest_id, language)
         if not path:
             return None
-        return f'{path}.{shorten_programming_language(language)}'
+        return f'{path}.{Layout().get_language(language)}'
 
     def __init__(self, *args, **kwargs):
         self.id = int()
@@ -82,7 +92,7 @@ class Submission:
         self.time_consumed_millis = int()
         self.memory_consumed_bytes = int()
         self.handles = list()
-        self.tags = list()
+        self.problem = kwargs.get('problem', None)
         self.language = str()
         self.verdict = enums.Verdict.FAILED.value
         self.download_status = kwargs.get('download_status',
@@ -95,39 +105,57 @@ class Submission:
         self.time_consumed_millis = info['timeConsumedMillis']
         self.memory_consumed_bytes = info['memoryConsumedBytes']
         self.handles = [member['handle'] for member in info['author']['members']]
-        self.tags = [tag for tag in info['problem']['tags']]
+        if not self.problem:
+            self.problem = Problem(contest_id=self.contest_id, info=info['problem'])
         self.language = info['programmingLanguage']
         self.verdict = info.get('verdict', enums.Verdict.FAILED.value)
 
+    @property
+    def tags(self) -> list:
+        return self.problem.tags if self.problem else []
+
+    @property
+    def problem_index(self) -> str:
+        return self.problem.index if self.problem else str()
+
+    @property
+    def url(self) -> str:
+        return f'https://codeforces.com/contest/{self.contest_id}/submission/{self.id}'
+
     def __ensure_directories(self) -> None:
-        path = Config().combine_path(self.contest_id, shorten_programming_language(self.language))
-        if path and not OPE(path):
-            OMD(path)
+        Layout().ensure(self.contest_id, [self.language])
 
     def download_source_code(self) -> enums.DownloadStatus:
-        r = requests.get(
-            f'https://codeforces.com/contest/{self.contest_id}/submission/{self.id}',
+        r = request(
+            self.url,
             headers=Config()['GET-Headers'],
-            allow_redirects=False
+            allow_redirects=False,
+            store=False
         )
-        time.sleep(Config()['Request-Delay'])
 
-        if check_for_redirecting(r):
+        # The challenge is solved when the request is made, a page still redirecting here is a failure.
+        if is_redirecting(r):
+            issue_timeout()
             status = enums.DownloadStatus.FAILED
             self.download_status = status.value
             return status
 
+        # Only pages the source was parsed from are cached, a retry must not replay a broken page.
         if check_for_status(r):
+            ResponseCache().discard(self.url)
             status = enums.DownloadStatus.FAILED
             self.download_status = status.value
             return status
 
         text = get_html_content(r, id='program-source-text')
         if not text:
+            ResponseCache().discard(self.url)
             status = enums.DownloadStatus.FAILED
             self.download_status = status.value
             return status
 
+        if not ResponseCache().contains(self.url):
+            ResponseCache().put(r, self.url)
         reset_timeout_counter(reset_consecutive=True)
         self.__dump_code(text)
         status = enums.DownloadStatus.FINISHED
@@ -135,39 +163,42 @@ class Submission:
         return status
 
     def validate_code(self, fixup=False) -> bool:
+        layout = Layout()
         data_path = self.get_dumped_code_path(self.id, self.contest_id, self.language)
         meta_path = self.get_dumped_code_meta_path(self.id, self.contest_id, self.language)
 
-        if OPE(OPS(meta_path)[0] + '.meta'):
-            ORE(OPS(meta_path)[0] + '.meta', meta_path)
+        if layout.exists(OPS(meta_path)[0] + '.meta'):
+            layout.rename(OPS(meta_path)[0] + '.meta', meta_path)
 
-        if OPE(data_path):
+        if layout.exists(data_path):
             with open(data_path, 'r', encoding='utf-8') as fp:
                 data = fp.read()
             if data is None or len(data) == 0 and fixup:
-                ORM(data_path)
+                layout.remove(data_path)
                 return False
 
-        if OPE(meta_path):
+        if layout.exists(meta_path):
             with open(meta_path, 'r') as fp:
                 meta = json.load(fp)
             if meta and fixup:
                 dump_id = meta.get('Id', None)
                 dump_contest_id = meta.get('Contest-Id', None)
                 dump_language = meta.get('Language', None)
+                dump_problem_index = meta.get('Problem-Index', None)
                 dump_tags = meta.get('Tags', None)
                 dump_code = meta.get('Source-Code', None)
 
                 if dump_id != self.id \
                         or dump_contest_id != self.contest_id \
                         or (dump_language and dump_language != self.language) \
+                        or (dump_problem_index and dump_problem_index != self.problem_index) \
                         or (dump_tags and set(dump_tags) != set(self.tags)):
-                    ORM(meta_path)
-                    if OPE(data_path):
-                        ORM(data_path)
+                    layout.remove(meta_path)
+                    if layout.exists(data_path):
+                        layout.remove(data_path)
                     return False
                 else:
-                    if not OPE(data_path) and dump_code and len(dump_code) > 0:
+                    if not layout.exists(data_path) and dump_code and len(dump_code) > 0:
                         self.__dump_code(dump_code)
         return True
 
@@ -180,13 +211,15 @@ class Submission:
                 'Id': self.id,
                 'Contest-Id': self.contest_id,
                 'Language': self.language,
-                'Tags': self.tags
+                'Problem-Index': self.problem_index
             }
 
         if meta_path:
             with open(meta_path, 'w+') as fp:
                 json.dump(meta, fp, indent=4)
+            Layout().add(meta_path)
 
         if data_path:
             with open(data_path, 'w+', encoding='utf-8') as fp:
                 fp.write(text.replace('\\r\\n', '\n').replace('\r\n', '\n').replace('\n\n', '\n'))
+            Layout().add(data_path)
@@ -4,6 +4,7 @@ import re
 import time
 import requests
 import shutil
+import threading
 import yoink.enums as enums
 from typing import Optional, Generator, Any, Union
 from bs4 import BeautifulSoup
@@ -19,6 +20,7 @@ ORM = os.remove
 __cc2sc_splitter = re.compile(r'(?<!^)(?=[A-Z])')
 __timeout_counter = 0
 __consecutive_timeouts_counter = 0
+__timeout_lock = threading.Lock()
 __language_map = {
     'c++': 'cpp',
     'clang': 'cpp',
@@ -68,19 +70,23 @@ def shorten_programming_language(language: str) -> str:
 def reset_timeout_counter(reset_consecutive=False) -> None:
     global __timeout_counter
     global __consecutive_timeouts_counter
-    __timeout_counter = 0
-    if reset_consecutive:
-        __consecutive_timeouts_counter = 0
+    with __timeout_lock:
+        __timeout_counter = 0
+        if reset_consecutive:
+            __consecutive_timeouts_counter = 0
 
 
 def issue_timeout() -> None:
     global __timeout_counter
     global __consecutive_timeouts_counter
-    __timeout_counter += 1
-    if __timeout_counter >= 5:
-        __consecutive_timeouts_counter += 1
+    with __timeout_lock:
+        __timeout_counter += 1
+        backoff = __timeout_counter >= 5
+        if backoff:
+            __consecutive_timeouts_counter += 1
+            __timeout_counter = 0
+    if backoff and not Config()['Reprocess-From-Cache']:
         time.sleep(Config()['Request-Timeout'])
-        reset_timeout_counter()
 
 
 def check_consecutive_timeouts() -> bool:
@@ -88,20 +94,6 @@ def check_consecutive_timeouts() -> bool:
     return __consecutive_timeouts_counter >= 5
 
 
-def check_for_redirecting(response: requests.Response) -> bool:
-    while 'redirecting' in response.text.lower():
-        try:
-            m = re.search(r'document\.location\.href=\"(.*)\"', response.text)
-            href = m.group(1)
-            response = requests.get(href,
-                                    headers=Config()['GET-Headers'],
-                                    allow_redirects=True)
-        except:
-            issue_timeout()
-            return True
-    return False
-
-
 def check_for_status(response: requests.Response) -> bool:
     try:
         response.raise_for_status()
@@ -124,7 +116,18 @@ def get_html_content(response: requests.Response, **kwargs) -> Optional[str]:
         return None
 
 
+def stringify_keys(obj):
+    # Binary codecs keep integer keys, which JSON pointers used by the merger cannot address.
+    if isinstance(obj, dict):
+        return {str(k): stringify_keys(v) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [stringify_keys(v) for v in obj]
+    return obj
+
+
 def merge_data_sources(path_from: str, path_to: str):
+    from yoink import codec
+
     from_dirs = os.listdir(path_from)
     to_dirs = os.listdir(path_to)
 
@@ -138,23 +141,29 @@ def merge_data_sources(path_from: str, path_to: str):
     merger = Merger(schema)
 
     for rd in from_dirs:
+        if not rd.isdigit():
+            continue
         from_dir = OPJ(path_from, rd)
         to_dir = OPJ(path_to, rd)
         if rd not in to_dirs:
             shutil.copytree(from_dir, to_dir, dirs_exist_ok=True)
             continue
 
-        with open(OPJ(to_dir, 'meta.json'), 'r', encoding='utf-8') as fp:
-            lhs_meta_json = json.load(fp)
-
-        with open(OPJ(from_dir, 'meta.json'), 'r', encoding='utf-8') as fp:
-            rhs_meta_json = json.load(fp)
+        lhs_found = codec.find(OPJ(to_dir, 'meta'))
+        rhs_found = codec.find(OPJ(from_dir, 'meta'))
+        if not lhs_found or not rhs_found:
+            shutil.copytree(from_dir, to_dir, dirs_exist_ok=True)
+            continue
 
-        result = merger.merge(lhs_meta_json, rhs_meta_json)
+        result = merger.merge(stringify_keys(codec.load(*lhs_found)), stringify_keys(codec.load(*rhs_found)))
         shutil.copytree(from_dir, to_dir, dirs_exist_ok=True)
 
-        with open(OPJ(to_dir, 'meta.json'), 'w', encoding='utf-8') as fp:
-            json.dump(result, fp, indent=4)
+        path = OPJ(to_dir, f'meta.{codec.get_codec().extension}')
+        codec.dump(result, path)
+        for other in codec.get_codecs():
+            other_path = OPJ(to_dir, f'meta.{other.extension}')
+            if other_path != path and OPE(other_path):
+                os.remove(other_path)
 
 
 class CustomDefaultDict(dict):
@@ -176,24 +185,6 @@ class Singleton(type):
         return cls._instances[cls]
 
 
-class TqdmControl(metaclass=Singleton):
-    def __init__(self):
-        self.indent = 0
-        self.pos = 0
-
-    def inc_indent(self):
-        self.indent += 1
-
-    def dec_indent(self):
-        self.indent -= 1
-
-    def inc_pos(self):
-        self.pos += 1
-
-    def dec_pos(self):
-        self.pos -= 1
-
-
 class Config(metaclass=Singleton):
     __built_in_path = 'yoink/config'
 
@@ -217,6 +208,11 @@ class Config(metaclass=Singleton):
             'Initial-Contest-Id': -1,
             'Max-Contests': 10,
             'Max-Submissions': 2000,
+            'Adaptive-Paging': True,
+            'Page-Size': 20000,
+            'Min-Page-Size': 500,
+            'Page-Safety-Margin': 1.25,
+            'Page-Prior-Weight': 2000,
             'Supported-Contest-Formats': [
                 enums.Type.CF.value,
                 enums.Type.ICPC.value
@@ -237,6 +233,47 @@ class Config(metaclass=Singleton):
                 enums.Language.GPP17_64.value,
             ],
             'Excluded-Tags': [],
+            'Cache-Responses': False,
+            'Cache-Path': 'Yoink-Cache',
+            'Cache-Max-Size': 8 * 1024 ** 3,
+            'Cache-Eviction-Policy': 'LRU',
+            'Cache-Compression-Level': 6,
+            'Cache-API-Max-Age': 3600,
+            'Reprocess-From-Cache': False,
+            'Problem-Quota': -1,
+            'Language-Quota': {'*': -1},
+            'Tag-Quota': {'*': -1},
+            'Schedule-Priority': ['Problem', 'Language', 'Tag'],
+            'Dedup-On-Download': False,
+            'Dedup-Path': 'Yoink-Dedup',
+            'Dedup-Permutations': 128,
+            'Dedup-Bands': 32,
+            'Dedup-Shingle-Size': 5,
+            'Dedup-Threshold': 0.8,
+            'Dedup-Representatives': 8,
+            'Dedup-Seed': 1,
+            'Dedup-Workers': -1,
+            'Normalize-On-Download': False,
+            'Normalize-Path': 'Yoink-Normalized',
+            'Normalize-Workers': -1,
+            'Stream-Contests': False,
+            'Prefetch-Contests': 1,
+            'Coordinate-Nodes': False,
+            'Node-Id': '',
+            'Lease-Path': '.leases',
+            'Lease-Duration': 600,
+            'Lock-Duration': 30,
+            'Lease-Poll-Interval': 5,
+            'Lease-Submissions': 500,
+            'Meta-Codec': 'json',
+            'Meta-Indent': 0,
+            'Cookie-Path': 'Yoink-Cookies.json',
+            'Redirect-Retries': 2,
+            'Reader-Path': 'Yoink-Dataset',
+            'Progress-Mode': 'tqdm',
+            'Progress-Stream': 'stderr',
+            'Progress-Interval': 0.5,
+            'Stats-Path': 'Yoink-Stats',
         }
 
         self.__ensure_data()
@@ -1,38 +1,93 @@
 import time
-import requests
-from tqdm import tqdm
-from typing import List
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Iterator, Optional
 from functools import cached_property
+from yoink.cache import request
 from yoink.contest import Contest
-from yoink.utils import Singleton, Config, CustomDefaultDict, TqdmControl
+from yoink.coordinator import Coordinator
+from yoink.events import track
+from yoink.utils import Singleton, Config, CustomDefaultDict
 
 
 class Yanker(metaclass=Singleton):
     def __init__(self, *args, **kwargs):
         self.contests = CustomDefaultDict(factory=lambda key: self.__request_raw_contests(id=key)[0])
-        if kwargs.get('download', False):
+        if kwargs.get('download', False) and not Config()['Stream-Contests']:
             self.__ensure_data()
 
     def __ensure_data(self) -> None:
-        progress_bar = tqdm(total=len(self.__eligible_raw_contests),
-                            position=TqdmControl().pos,
-                            leave=True,
-                            desc=f'Contests',
-                            bar_format='{l_bar}{bar}| {n_fmt}/{total_fmt} [{elapsed}, {rate_fmt}{postfix}]')
-        for raw_contest in self.__eligible_raw_contests:
-            contest_id = raw_contest['id']
-            contest_path = Contest.get_path(contest_id, meta=True)
-            TqdmControl().inc_indent()
-            TqdmControl().inc_pos()
+        deferred = []
+        for raw_contest in track(self.__eligible_raw_contests, desc='Contests'):
+            contest_instance = Yanker.__load_contest(raw_contest)
+            if contest_instance:
+                self.contests[raw_contest['id']] = contest_instance
+            elif Yanker.__is_pending(raw_contest):
+                deferred.append(raw_contest)
+
+        for raw_contest in deferred:
+            contest_instance = Yanker.__load_contest(raw_contest, wait=True)
+            if contest_instance:
+                self.contests[raw_contest['id']] = contest_instance
+
+    @staticmethod
+    def __get_lease_key(raw_contest) -> str:
+        return f'contest-{raw_contest["id"]}'
+
+    @staticmethod
+    def __is_pending(raw_contest) -> bool:
+        # Another node is still downloading the contest's metadata.
+        return Coordinator().enabled and not Coordinator().is_done(Yanker.__get_lease_key(raw_contest))
+
+    @staticmethod
+    def __load_contest(raw_contest, wait=False) -> Optional[Contest]:
+        contest_path = Contest.get_path(raw_contest['id'], meta=True)
+        key = Yanker.__get_lease_key(raw_contest)
+        while True:
             contest_instance = Contest.deserialize(download=Config()['After-Update'], path=contest_path)
-            if not contest_instance:
+            if contest_instance:
+                return contest_instance
+            if Coordinator().claim(key):
                 contest_instance = Contest(download=True, info=raw_contest)
-            TqdmControl().dec_pos()
-            TqdmControl().dec_indent()
-            self.contests[contest_id] = contest_instance
-            progress_bar.update()
-
-        progress_bar.close()
+                Coordinator().release(key, done=True)
+                return contest_instance
+            if Coordinator().is_done(key):
+                return Contest.deserialize(download=Config()['After-Update'], path=contest_path)
+            if not wait:
+                return None
+            time.sleep(Config()['Lease-Poll-Interval'])
+
+    def stream(self) -> Iterator[Contest]:
+        depth = max(Config()['Prefetch-Contests'], 0)
+        raw_contests = iter(self.__eligible_raw_contests)
+        pending = deque()
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            def prefetch(size):
+                while len(pending) < size:
+                    raw_contest = next(raw_contests, None)
+                    if not raw_contest:
+                        break
+                    pending.append((raw_contest, executor.submit(Yanker.__load_contest, raw_contest)))
+
+            deferred = []
+            prefetch(1)
+            while pending:
+                raw_contest, future = pending.popleft()
+                contest = future.result()
+                prefetch(depth)
+                if contest:
+                    yield contest
+                elif Yanker.__is_pending(raw_contest):
+                    deferred.append(raw_contest)
+                del contest, future
+                prefetch(1)
+
+        # Contests other nodes were busy with are picked up once their metadata is written.
+        for raw_contest in deferred:
+            contest = Yanker.__load_contest(raw_contest, wait=True)
+            if contest:
+                yield contest
+            del contest
 
     @staticmethod
     def __is_eligible(raw_contest) -> bool:
@@ -56,7 +111,7 @@ class Yanker(metaclass=Singleton):
                                             apply_config_constraints=True)
 
         self.__print_eligible_contests(contests=result)
-        if len(result) > 0:
+        if len(result) > 0 and not Config()['Reprocess-From-Cache']:
             time.sleep(Config()['Request-Delay'])
 
         return result
@@ -88,11 +143,9 @@ class Yanker(metaclass=Singleton):
         if contest_id:
             return [next(v for i, v in enumerate(self.__request_raw_contests()) if v['id'] == contest_id)]
 
-        r = requests.get('https://codeforces.com/api/contest.list')
+        r = request('https://codeforces.com/api/contest.list', delay=False, max_age=Config()['Cache-API-Max-Age'])
 
-        try:
-            r.raise_for_status()
-        except requests.HTTPError:
+        if not r.ok:
             print(r.status_code)
             exit()
 